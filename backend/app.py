@@ -1,114 +1,168 @@
+import hashlib
 import os
-from flask import Flask, request, jsonify
+import shutil
+from datetime import timedelta
+from flask import Flask, Request, Response, current_app, request, jsonify
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
+from game_data import get_game_data
 from save_parser import analyze_save_file
-from models import db, Save, FishSnapshot, RecipeSnapshot
+import compression
+import instrumentation
+from instrumentation import stage
+from jobs import JobQueue, QueueFull, fail_orphaned_jobs
+from locales import get_locale_strings, resolve_locale
+from models import db, AnalysisJob, Save, upgrade_schema
+from result_cache import ResultCache
+from timeline import farm_timeline, record_rollup, timeline_version
+from trackers import TRACKERS
+from uploads import SpooledUpload, UnsupportedUpload, UploadTooLarge, open_save, save_digest
+from trackers.bundles import bundles_needing
+from trackers.crafting import recipes_using
+from trackers.fish import catchable_fish, fishing_conditions
+from snapshots import (
+    FISH_CAUGHT, RECIPE_COOKED, chain_rows, diff_snapshots, get_catalog, insert_snapshots,
+    load_state, load_words, migrate_legacy_snapshots, pack_state, snapshot_digest,
+    state_from_result, tracker_states,
+)
+
+
+class UploadRequest(Request):
+    """Request that keeps file uploads in memory up to UPLOAD_SPOOL_THRESHOLD bytes."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Larger uploads roll over to an anonymous temp file, which the OS
+        # reclaims even if the worker dies mid-request
+        return SpooledUpload(max_size=current_app.config['UPLOAD_SPOOL_THRESHOLD'], mode='rb+')
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)
 
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'xml', 'txt', ''}
+ALLOWED_EXTENSIONS = {'xml', 'txt', 'gz', 'zst', 'zip', ''}
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tracker.db'
+app.config['MAX_SAVE_SIZE'] = 128 * 1024 * 1024  # max uncompressed size of a compressed upload
+app.config['UPLOAD_SPOOL_THRESHOLD'] = 8 * 1024 * 1024  # spool larger uploads to disk
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///tracker.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['RESULT_CACHE_SIZE'] = 128  # entries kept in memory per worker
+app.config['RESULT_CACHE_TTL'] = 60 * 60  # seconds
+app.config['RESULT_CACHE_PERSIST'] = False  # also cache results in the database
+app.config['ANALYSIS_WORKERS'] = 2  # background analysis threads per worker process
+app.config['ANALYSIS_QUEUE_DEPTH'] = 8  # queued jobs per worker process before rejecting
+app.config['ANALYSIS_JOB_RETENTION'] = 24 * 60 * 60  # seconds a finished job can still be polled
+app.config['INSTRUMENTATION'] = os.environ.get('TRACKER_INSTRUMENTATION') == '1'  # per-stage timings
+app.config['PROFILE_SAMPLE_RATE'] = 0.0  # fraction of instrumented requests to cProfile/tracemalloc
 
 db.init_app(app)
+instrumentation.init_app(app)
+compression.init_app(app)  # after instrumentation, so compression is timed
+
 
-with app.app_context():
-    db.create_all()
+def init_db() -> None:
+    """
+    Create and upgrade the database schema, migrate legacy snapshot rows and
+    fail the analysis jobs a previous run left unfinished.
+
+    Run once before the workers start (init_db.py, from start-backend.sh):
+    concurrent runs race on creating the same tables and indexes.
+    """
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        migrate_legacy_snapshots(get_game_data())
+        fail_orphaned_jobs()
+
+result_cache = ResultCache(
+    max_entries=app.config['RESULT_CACHE_SIZE'],
+    ttl=app.config['RESULT_CACHE_TTL'],
+    persistent=app.config['RESULT_CACHE_PERSIST'],
+)
 
 
 def allowed_file(filename: str) -> bool:
-    """Check if file has no extension or is xml/txt (save files often have no extension)."""
+    """Check if file has no extension, is xml/txt (save files often have no extension) or is compressed."""
     if '.' not in filename:
         return True
     return filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def save_snapshot(result: dict) -> Save:
+def farm_id_for(result: dict) -> str | None:
+    """
+    Identity of the farm an analysis result belongs to, or None if the save lacks one.
+
+    A farm is its game's unique id plus the host's name, hashed into a
+    fixed-width key that indexes compactly and is safe to put in URLs.
+    """
+    game_id = result.get("farm", {}).get("gameId")
+    host = next((player["name"] for player in result.get("players", ()) if player["host"]), None)
+    if game_id is None or host is None:
+        return None
+    return hashlib.sha256(f"{game_id}\0{host}".encode()).hexdigest()[:32]
+
+
+def previous_save_of(save: Save) -> Save | None:
+    """The same farm's upload before save, or None."""
+    if save.farm_id is None:
+        return None
+
+    # Single seek on the (farm_id, id) index
+    return (
+        Save.query
+        .filter(Save.farm_id == save.farm_id, Save.id < save.id)
+        .order_by(Save.id.desc())
+        .first()
+    )
+
+
+def save_snapshot(result: dict, content_hash: str | None = None) -> Save:
     """Persist analysis results to the database and return the new Save record."""
-    save = Save()
+    catalog_id = get_catalog(get_game_data())
+    save = Save(content_hash=content_hash, catalog_id=catalog_id, farm_id=farm_id_for(result))
     db.session.add(save)
     db.session.flush()  # get save.id before committing
 
-    # Fish snapshots — one row per fish species
-    for fish in result["fish"].get("caughtList", []):
-        db.session.add(FishSnapshot(
-            save_id=save.id,
-            fish_id=fish["id"],
-            fish_name=fish["name"],
-            caught=True
-        ))
-
-    for fish in result["fish"]["missingList"]:
-        db.session.add(FishSnapshot(
-            save_id=save.id,
-            fish_id=fish["id"],
-            fish_name=fish["name"],
-            caught=False
-        ))
-
-    # Recipe snapshots — one row per recipe
-    for recipe in result["recipes"].get("cookedList", []):
-        db.session.add(RecipeSnapshot(
-            save_id=save.id,
-            recipe_name=recipe["name"],
-            learned=True,
-            cooked=True
-        ))
-
-    for recipe in result["recipes"]["missingList"]:
-        db.session.add(RecipeSnapshot(
-            save_id=save.id,
-            recipe_name=recipe["name"],
-            learned=not recipe["needToLearn"],
-            cooked=False
-        ))
+    # Caught/learned/cooked sets, stored as bitsets over the catalog and
+    # delta-encoded against the farm's previous upload
+    state = state_from_result(result)
+    words = pack_state(catalog_id, state)
+    parent = previous_save_of(save)
+    parent_words = load_words(parent) if parent is not None else None
+    insert_snapshots(chain_rows(save, words, parent, parent_words))
+    record_rollup(save, state)
 
     db.session.commit()
     return save
 
 
+def diff_saves(from_save: Save, to_save: Save) -> dict:
+    """Fish caught and recipes cooked in to_save that were not in from_save."""
+    added = diff_snapshots(from_save, to_save)
+    fish_data = get_game_data().fish
+
+    return {
+        "newlyCaughtFish": [
+            {"id": fish_id, "name": fish_data.get(fish_id, {}).get("name", fish_id)}
+            for fish_id in added[FISH_CAUGHT]
+        ],
+        "newlyCookedRecipes": [{"name": n} for n in sorted(added[RECIPE_COOKED])],
+    }
+
+
 def compute_diff(current_save: Save) -> dict | None:
     """
-    Compare the current save snapshot against the previous one.
+    Compare the current save snapshot against the previous upload of the same farm.
     Returns newly caught fish and newly cooked recipes, or None if this is
-    the first upload.
+    the farm's first upload.
     """
-    previous_save = (
-        Save.query
-        .filter(Save.id < current_save.id)
-        .order_by(Save.id.desc())
-        .first()
-    )
-
+    previous_save = previous_save_of(current_save)
     if previous_save is None:
         return None
 
-    # Fish diff
-    prev_caught = {s.fish_id for s in previous_save.fish_snapshots if s.caught}
-    curr_caught = {s.fish_id for s in current_save.fish_snapshots if s.caught}
-    newly_caught_ids = curr_caught - prev_caught
-    newly_caught = [
-        {"id": s.fish_id, "name": s.fish_name}
-        for s in current_save.fish_snapshots
-        if s.fish_id in newly_caught_ids
-    ]
-
-    # Recipe diff
-    prev_cooked = {s.recipe_name for s in previous_save.recipe_snapshots if s.cooked}
-    curr_cooked = {s.recipe_name for s in current_save.recipe_snapshots if s.cooked}
-    newly_cooked = [{"name": n} for n in sorted(curr_cooked - prev_cooked)]
-
     return {
         "previousUploadAt": previous_save.uploaded_at.isoformat(),
-        "newlyCaughtFish": newly_caught,
-        "newlyCookedRecipes": newly_cooked,
+        **diff_saves(previous_save, current_save),
     }
 
 
@@ -118,39 +172,344 @@ def health_check():
     return jsonify({"status": "ok"})
 
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze():
-    """Analyze an uploaded save file, persist a snapshot, and return results with progress diff."""
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Per-stage timing aggregates for this worker process, in Prometheus text format."""
+    return Response(instrumentation.metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/crafting/uses/<item_id>', methods=['GET'])
+def crafting_uses(item_id):
+    """Crafting recipes that take the given item (e.g. 388 or (O)388) as an ingredient."""
+    game_data = get_game_data()
+    return jsonify({
+        "item": {"id": item_id, "name": game_data.items.name(item_id)},
+        "recipes": recipes_using(game_data["crafting"], item_id),
+    })
+
+
+@app.route('/api/bundles/uses/<item_id>', methods=['GET'])
+def bundle_uses(item_id):
+    """Community Center bundles that take the given item (e.g. 24 or (O)24), with the quantity and quality needed."""
+    game_data = get_game_data()
+    return jsonify({
+        "item": {"id": item_id, "name": game_data.items.name(item_id)},
+        "bundles": bundles_needing(game_data["bundles"], item_id),
+    })
+
+
+@app.route('/api/diff', methods=['GET'])
+def diff():
+    """Progress made between two saved uploads: /api/diff?from=<save id>&to=<save id>."""
+    from_id = request.args.get('from', type=int)
+    to_id = request.args.get('to', type=int)
+    if from_id is None or to_id is None:
+        return jsonify({"error": "Both 'from' and 'to' save ids are required"}), 400
+
+    from_save = db.session.get(Save, from_id)
+    to_save = db.session.get(Save, to_id)
+    if from_save is None or to_save is None:
+        return jsonify({"error": "Save not found"}), 404
+    # Snapshots of different farms (or of saves without a farm id) share
+    # no history, so a diff between them is meaningless
+    if from_save.farm_id is None or from_save.farm_id != to_save.farm_id:
+        return jsonify({"error": "Saves must belong to the same farm"}), 400
+
+    return jsonify({
+        "from": {"id": from_save.id, "uploadedAt": from_save.uploaded_at.isoformat()},
+        "to": {"id": to_save.id, "uploadedAt": to_save.uploaded_at.isoformat()},
+        **diff_saves(from_save, to_save),
+    })
+
+
+@app.route('/api/saves/<int:save_id>', methods=['GET'])
+def get_save(save_id):
+    """
+    Fish and cooking results of a stored upload, rebuilt from its snapshot.
+
+    Optional `season`, `weather` and `hour` query parameters add the uncaught
+    fish catchable under those conditions as fish.catchableNow.
+
+    Responses carry a strong ETag derived from the snapshot content, the game
+    data version, the language and the fishing conditions, so polling clients
+    can revalidate with If-None-Match and get a 304 without the results being
+    rebuilt.
+    """
+    locale, error = get_locale()
+    if error:
+        return error
+    conditions, error = get_fishing_conditions()
+    if error:
+        return error
+
+    save = db.session.get(Save, save_id)
+    if save is None:
+        return jsonify({"error": "Save not found"}), 404
+
+    game_data = get_game_data()
+    words = load_words(save)
+    etag = snapshot_digest(save, words, game_data.version, locale, conditions)
+    response = compression.not_modified(request, etag)
+    if response is None:
+        states = tracker_states(load_state(save, words))
+        result = {
+            tracker.key: tracker.build_result(states[tracker.key], game_data[tracker.key], game_data.items)
+            for tracker in TRACKERS if tracker.key in states
+        }
+        response = jsonify(localize_result(add_catchable_fish({
+            "id": save.id,
+            "uploadedAt": save.uploaded_at.isoformat(),
+            **result,
+        }, conditions), locale))
+        response.set_etag(etag)
+
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/farms/<farm_id>/timeline', methods=['GET'])
+def get_timeline(farm_id):
+    """
+    Fish caught and recipes learned/cooked at each of a farm's uploads, with completion percentages.
+
+    Served from the per-upload rollups, with an ETag so dashboards polling
+    an unchanged farm get a 304.
+    """
+    points, first_id, last_id = timeline_version(farm_id)
+    if not points:
+        return jsonify({"error": "Farm not found"}), 404
+
+    etag = f"{farm_id}-{points}-{first_id}-{last_id}"
+    response = compression.not_modified(request, etag)
+    if response is None:
+        response = jsonify({"farmId": farm_id, "timeline": farm_timeline(farm_id)})
+        response.set_etag(etag)
+
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def get_upload():
+    """Return the uploaded save file, or an error response tuple if the upload is invalid."""
     if 'file' not in request.files:
-        return jsonify({"error": "No file provided"}), 400
+        return None, (jsonify({"error": "No file provided"}), 400)
 
     file = request.files['file']
 
     if file.filename == '':
-        return jsonify({"error": "No file selected"}), 400
+        return None, (jsonify({"error": "No file selected"}), 400)
 
     if not allowed_file(file.filename):
-        return jsonify({"error": "Invalid file type. Please upload a Stardew Valley save file."}), 400
+        return None, (jsonify({"error": "Invalid file type. Please upload a Stardew Valley save file."}), 400)
+
+    return file, None
 
-    filepath = None  # initialize before try so except block can always reference it safely
+
+def get_locale():
+    """Return the requested locale (None for English), or an error response tuple if it is unsupported."""
+    lang = request.args.get('lang') or request.form.get('lang')
     try:
-        filename = secure_filename(file.filename) or 'save_file'
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        return resolve_locale(lang), None
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
 
-        result = analyze_save_file(filepath)
-        os.remove(filepath)
 
-        current_save = save_snapshot(result)
+def get_fishing_conditions():
+    """
+    Return the requested "catchable now" conditions (None if no season,
+    weather or hour was given), or an error response tuple if they are invalid.
+    """
+    season = request.args.get('season')
+    weather = request.args.get('weather')
+    hour = request.args.get('hour')
+    if season is None and weather is None and hour is None:
+        return None, None
+    try:
+        if hour is not None:
+            if not hour.isdigit():
+                raise ValueError(f"Invalid hour: {hour}")
+            hour = int(hour)
+        return fishing_conditions(season, weather, hour), None
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+
+
+def add_catchable_fish(payload: dict, conditions: dict | None) -> dict:
+    """Add the uncaught fish catchable under conditions to the fish results, as "catchableNow"."""
+    if conditions is None or "fish" not in payload:
+        return payload
+
+    fish = payload["fish"]
+    caught = [f["id"] for f in fish["caughtList"]]
+    return {
+        **payload,
+        "fish": {
+            **fish,
+            "catchableNow": {**conditions, "fish": catchable_fish(get_game_data()["fish"], caught, conditions)},
+        },
+    }
+
+
+def localize_result(payload: dict, locale: str | None) -> dict:
+    """Translate the fish, recipe and ingredient names of an analysis payload into locale."""
+    if locale is None:
+        return payload
+
+    strings = get_locale_strings(locale)
+
+    def localize_sections(results):
+        localized = {**results}
+        for tracker in TRACKERS:
+            if tracker.key in results:
+                localized[tracker.key] = tracker.localize(results[tracker.key], strings)
+        return localized
+
+    localized = localize_sections(payload)
+    if "players" in payload:
+        localized["players"] = [localize_sections(player) for player in payload["players"]]
+
+    diff = payload.get("progressSince")
+    if diff:
+        localized["progressSince"] = {
+            **diff,
+            "newlyCaughtFish": [
+                {**fish, "name": strings.item(fish["id"], fish["name"])} for fish in diff["newlyCaughtFish"]
+            ],
+            "newlyCookedRecipes": [
+                {"name": strings.recipe(recipe["name"])} for recipe in diff["newlyCookedRecipes"]
+            ],
+        }
+    return localized
+
+
+def analyze_upload(stream) -> dict:
+    """Analyze a save stream, persist a snapshot, and return results with progress diff."""
+    with stage("hash"):
+        content_hash = save_digest(stream, app.config['MAX_SAVE_SIZE'])
+
+    # Identical saves are answered from the cache without reparsing
+    with stage("cache"):
+        cache_key = f"{content_hash}:{get_game_data().version}"
+        result = result_cache.get(cache_key)
+    if result is None:
+        with open_save(stream, app.config['MAX_SAVE_SIZE']) as save:
+            result = analyze_save_file(save)
+        result_cache.put(cache_key, result)
+
+    # Re-uploads of the same file reuse the existing snapshot
+    with stage("save_snapshot"):
+        current_save = Save.query.filter_by(content_hash=content_hash).first()
+        if current_save is None:
+            current_save = save_snapshot(result, content_hash)
+    with stage("compute_diff"):
         diff = compute_diff(current_save)
 
-        return jsonify({**result, "progressSince": diff})
+    return {**result, "saveId": current_save.id, "farmId": current_save.farm_id, "progressSince": diff}
+
 
+job_queue = JobQueue(
+    app,
+    analyze_upload,
+    workers=app.config['ANALYSIS_WORKERS'],
+    queue_depth=app.config['ANALYSIS_QUEUE_DEPTH'],
+    retention=timedelta(seconds=app.config['ANALYSIS_JOB_RETENTION']),
+)
+
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze():
+    """
+    Analyze an uploaded save file, persist a snapshot, and return results with progress diff.
+
+    The save may be uploaded gzip, zstd or zip compressed (see uploads.py).
+    An optional `lang` (query string or form field, e.g. "ja-JP" or "ja")
+    returns fish, recipe and ingredient names in that language, and optional
+    `season`, `weather` and `hour` query parameters add the uncaught fish
+    catchable under those conditions (see get_save).
+    """
+    with stage("upload"):
+        file, error = get_upload()
+    if error:
+        return error
+
+    locale, error = get_locale()
+    if error:
+        return error
+    conditions, error = get_fishing_conditions()
+    if error:
+        return error
+
+    try:
+        result = add_catchable_fish(analyze_upload(file.stream), conditions)
+        with stage("localize"):
+            result = localize_result(result, locale)
+        with stage("serialize"):
+            return jsonify(result)
+
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except UnsupportedUpload as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        if filepath and os.path.exists(filepath):
-            os.remove(filepath)
         return jsonify({"error": f"Failed to analyze save file: {str(e)}"}), 500
 
 
+def job_status(job: AnalysisJob, locale: str | None = None, conditions: dict | None = None) -> dict:
+    """Serialize a job for the status endpoint."""
+    status = {
+        "jobId": job.id,
+        "state": job.state,
+        "createdAt": job.created_at.isoformat(),
+        "startedAt": job.started_at.isoformat() if job.started_at else None,
+        "finishedAt": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.state == AnalysisJob.SUCCEEDED:
+        status["result"] = localize_result(add_catchable_fish(job.result, conditions), locale)
+    elif job.state == AnalysisJob.FAILED:
+        status["error"] = f"Failed to analyze save file: {job.error}"
+    return status
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue an uploaded save file for background analysis and return its job id."""
+    file, error = get_upload()
+    if error:
+        return error
+
+    # The request's upload stream is closed when the request ends, so the
+    # job gets its own copy
+    stream = SpooledUpload(max_size=app.config['UPLOAD_SPOOL_THRESHOLD'], mode='w+b')
+    shutil.copyfileobj(file.stream, stream)
+    stream.seek(0)
+
+    try:
+        job = job_queue.submit(stream)
+    except QueueFull:
+        stream.close()
+        response = jsonify({"error": "Analysis queue is full, please retry shortly"})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    return jsonify(job_status(job)), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll the state of a background analysis job, including its result once finished."""
+    locale, error = get_locale()
+    if error:
+        return error
+    conditions, error = get_fishing_conditions()
+    if error:
+        return error
+
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_status(job, locale, conditions))
+
+
 if __name__ == '__main__':
+    init_db()
     app.run(debug=True, port=5001)
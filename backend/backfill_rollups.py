@@ -0,0 +1,15 @@
+"""
+Write progress timeline rollups for saves uploaded before the timeline existed.
+
+Run once from the backend directory after upgrading:
+
+    python backfill_rollups.py
+"""
+from app import app
+from timeline import backfill_rollups
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        backfilled = backfill_rollups()
+    print(f"Backfilled {backfilled} timeline rollups")
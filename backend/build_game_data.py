@@ -0,0 +1,13 @@
+"""
+Compile the unpacked game JSON into the bundle loaded by the backend and CLIs.
+
+Run from the backend directory before starting the server:
+
+    python build_game_data.py
+"""
+from game_data import compile_bundle
+
+
+if __name__ == "__main__":
+    path = compile_bundle()
+    print(f"Wrote game data bundle to {path}")
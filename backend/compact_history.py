@@ -0,0 +1,27 @@
+"""
+Downsample old snapshot history (see snapshots.COMPACTION_POLICY).
+
+Run from the backend directory, e.g. daily from cron:
+
+    python compact_history.py [--vacuum]
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app import app
+from models import db
+from snapshots import compact_history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Downsample old snapshot history.")
+    parser.add_argument("--vacuum", action="store_true", help="Also VACUUM the database to return freed space")
+    args = parser.parse_args()
+
+    with app.app_context():
+        removed = compact_history()
+        if args.vacuum:
+            with db.engine.connect() as conn:
+                conn.execute(text("VACUUM"))
+    print(f"Removed {removed} snapshots")
@@ -0,0 +1,106 @@
+"""
+Response compression and conditional GET support.
+
+Analysis results are large, repetitive JSON. When the client accepts it,
+responses over COMPRESS_MIN_SIZE bytes are sent brotli compressed (if the
+optional `brotli` package is installed) or gzip compressed. A compressed
+response is a different representation from the identity one, so a strong
+ETag gets a "-gzip"/"-br" suffix. not_modified() treats all of these
+variants as the same resource when checking If-None-Match, and answers with
+the variant the client holds.
+"""
+import gzip
+
+from instrumentation import stage
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html", "text/csv"}
+
+
+def available_encodings() -> list[str]:
+    """Content codings this server can produce, best first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level)
+
+
+def matching_etag(request, etag: str) -> str | None:
+    """The variant of etag (identity or encoded) the request's If-None-Match names, if any."""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    for variant in (etag, *(f"{etag}-{encoding}" for encoding in available_encodings())):
+        if if_none_match.contains(variant):
+            return variant
+    return None
+
+
+def not_modified(request, etag: str):
+    """
+    A 304 response if the request already holds a representation tagged etag, else None.
+
+    The 304 carries the variant the client holds, which is the ETag its 200
+    response was sent with after compression.
+    """
+    variant = matching_etag(request, etag)
+    if variant is None:
+        return None
+
+    from flask import Response
+
+    response = Response(status=304)
+    response.set_etag(variant)
+    return response
+
+
+def init_app(app) -> None:
+    """
+    Compress eligible responses.
+
+    Register after instrumentation.init_app, so compression is timed as its
+    own stage of the request.
+
+    Config:
+        COMPRESS_MIN_SIZE: smallest body, in bytes, worth compressing (default 1024)
+        COMPRESS_LEVEL: gzip level, also used as the brotli quality (default 6)
+    """
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is None or response.content_length < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        with stage("compress"):
+            response.set_data(compress(response.get_data(), encoding, app.config['COMPRESS_LEVEL']))
+        response.headers['Content-Encoding'] = encoding
+
+        etag, weak = response.get_etag()
+        if etag is not None:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
@@ -0,0 +1,183 @@
+"""
+Process-wide registry of the game data the trackers compare saves against.
+
+The unpacked game JSON is parsed once per worker process and shared by every
+request. The registry checks the source files' modification times on each
+lookup and rebuilds itself only when one of them has changed on disk.
+
+Which files are read is driven by the trackers: every tracker lists its
+data_files and builds its own index from them (see trackers.base.Tracker).
+
+Loading goes through a precompiled pickle bundle when one matching the
+current source files exists (see build_game_data.py), so a cold worker skips
+the JSON parsing entirely.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+import items
+from trackers import TRACKERS
+
+BASE_PATH = os.path.dirname(__file__)
+DATA_DIR = os.path.join(BASE_PATH, "../xnbcli-macos/unpacked")
+
+
+@dataclass(frozen=True)
+class GameData:
+    """Immutable, precomputed view of the game data shared across requests."""
+    indexes: Mapping[str, Mapping]  # tracker key -> that tracker's index
+    items: items.ItemCatalog        # item id -> display name
+    version: str                    # short hash of the source JSON
+
+    def __getitem__(self, key):
+        return self.indexes[key]
+
+    @property
+    def recipes(self) -> Mapping[str, dict]:
+        """Recipe name -> recipe info."""
+        return self.indexes["recipes"]["recipes"]
+
+    @property
+    def recipe_id_to_name(self) -> Mapping[str, str]:
+        """Recipe output id -> recipe name."""
+        return self.indexes["recipes"]["recipe_id_to_name"]
+
+    @property
+    def fish(self) -> Mapping[str, dict]:
+        """Fish id -> fish info."""
+        return self.indexes["fish"]["fish"]
+
+    @property
+    def fish_ids(self) -> frozenset:
+        return self.indexes["fish"]["fish_ids"]
+
+
+def data_files(trackers=TRACKERS) -> list[str]:
+    """Every unpacked data file the trackers and item catalogue depend on."""
+    names = set(items.DATA_FILES)
+    for tracker in trackers:
+        names.update(tracker.data_files)
+    return sorted(names)
+
+
+SOURCE_PATHS = tuple(os.path.join(DATA_DIR, name) for name in data_files()) + (items.OBJECT_NAMES_PATH,)
+
+# Precompiled bundle written by build_game_data.py. Bump BUNDLE_FORMAT whenever
+# the pickled payload changes shape so stale bundles are ignored.
+BUNDLE_PATH = os.path.join(BASE_PATH, "game_data.pickle")
+BUNDLE_FORMAT = 5
+
+
+def load_table(name: str) -> dict:
+    """Load the "content" dict of an unpacked game data file."""
+    with open(os.path.join(DATA_DIR, name), "r", encoding="utf8") as f:
+        raw = json.load(f)
+    return raw.get("content", raw)
+
+
+def load_indexes(trackers=TRACKERS) -> tuple[items.ItemCatalog, dict]:
+    """Parse the unpacked game JSON and build the item catalogue and every tracker's index."""
+    tables = {name: load_table(name) for name in data_files(trackers)}
+    item_catalog = items.build_item_catalog({name: tables[name] for name in items.DATA_FILES})
+    indexes = {
+        tracker.key: tracker.build_index({name: tables[name] for name in tracker.data_files}, item_catalog)
+        for tracker in trackers
+    }
+    return item_catalog, indexes
+
+
+def source_fingerprint() -> dict:
+    """Content hash of every source JSON file, keyed by its relative path."""
+    fingerprint = {}
+    for path in SOURCE_PATHS:
+        with open(path, "rb") as f:
+            fingerprint[os.path.relpath(path, BASE_PATH)] = hashlib.sha256(f.read()).hexdigest()
+    return fingerprint
+
+
+def compile_bundle(bundle_path: str = BUNDLE_PATH) -> str:
+    """Compile the unpacked game JSON into a single pickled bundle."""
+    item_catalog, indexes = load_indexes()
+    payload = {
+        "format": BUNDLE_FORMAT,
+        "sources": source_fingerprint(),
+        "items": item_catalog,
+        "indexes": indexes,
+    }
+    tmp_path = f"{bundle_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, bundle_path)
+    return bundle_path
+
+
+def load_bundle(fingerprint: dict, bundle_path: str = BUNDLE_PATH) -> tuple[items.ItemCatalog, dict] | None:
+    """
+    Load the precompiled (item catalogue, indexes), or None if the bundle is missing or stale.
+
+    A bundle is stale when it was written by a different BUNDLE_FORMAT, from
+    source JSON that no longer matches what is on disk, or for a different
+    set of trackers.
+    """
+    try:
+        with open(bundle_path, "rb") as f:
+            payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if payload.get("format") != BUNDLE_FORMAT:
+        return None
+    if payload.get("sources") != fingerprint:
+        return None
+    if set(payload["indexes"]) != {tracker.key for tracker in TRACKERS}:
+        return None
+    return payload["items"], payload["indexes"]
+
+
+def build_game_data() -> GameData:
+    """Build GameData from the compiled bundle, falling back to the raw JSON."""
+    fingerprint = source_fingerprint()
+    item_catalog, indexes = load_bundle(fingerprint) or load_indexes()
+    version = hashlib.sha256(
+        json.dumps(fingerprint, sort_keys=True).encode()
+    ).hexdigest()[:12]
+    return GameData(
+        indexes=MappingProxyType({key: MappingProxyType(index) for key, index in indexes.items()}),
+        items=item_catalog,
+        version=version,
+    )
+
+
+_lock = threading.Lock()
+_game_data = None
+_source_mtimes = None
+
+
+def _current_mtimes():
+    return tuple(os.stat(path).st_mtime_ns for path in SOURCE_PATHS)
+
+
+def get_game_data() -> GameData:
+    """
+    Return the shared GameData, building it on first use.
+
+    The data is rebuilt only when one of the source JSON files has been
+    modified since it was last loaded.
+    """
+    global _game_data, _source_mtimes
+
+    mtimes = _current_mtimes()
+    if _game_data is not None and mtimes == _source_mtimes:
+        return _game_data
+
+    with _lock:
+        if _game_data is None or mtimes != _source_mtimes:
+            _game_data = build_game_data()
+            _source_mtimes = mtimes
+        return _game_data
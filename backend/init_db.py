@@ -0,0 +1,13 @@
+"""
+Create or upgrade the database schema before the backend starts.
+
+Run from the backend directory before starting any workers:
+
+    python init_db.py
+"""
+from app import init_db
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date")
@@ -0,0 +1,215 @@
+"""
+Lightweight per-stage instrumentation for the analyze pipeline.
+
+Code marks its stages with `with stage("parse"):`. When a request is being
+instrumented, each stage's wall time, CPU time and (for sampled requests)
+peak traced memory is recorded; otherwise stage() hands back a shared no-op
+context manager, so the disabled cost is one context variable lookup.
+
+Recorded stages are reported three ways:
+- a Server-Timing response header on the request that ran them
+- process-wide aggregates rendered in Prometheus text format (/api/metrics)
+- for a sampled fraction of requests, a cProfile dump and tracemalloc top
+  allocations written to PROFILE_DIR
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+_NULL_STAGE = nullcontext()
+_recorder = ContextVar("stage_recorder", default=None)
+
+# tracemalloc is process-wide: it is started by the first sampled request and
+# stopped only once the last overlapping one has finished
+_tracing_lock = threading.Lock()
+_tracing_requests = 0
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StageRecorder:
+    """Stages recorded during one request: (name, wall seconds, cpu seconds, peak bytes or None)."""
+
+    __slots__ = ("stages", "trace_memory")
+
+    def __init__(self, trace_memory: bool = False):
+        self.stages = []
+        self.trace_memory = trace_memory
+
+
+@contextmanager
+def _timed(recorder: StageRecorder, name: str):
+    if recorder.trace_memory:
+        tracemalloc.reset_peak()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    try:
+        yield
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] if recorder.trace_memory else None
+        recorder.stages.append((name, time.perf_counter() - wall, time.thread_time() - cpu, peak))
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage of the current request, if instrumented."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _timed(recorder, name)
+
+
+class StageMetrics:
+    """Process-wide aggregates of recorded stages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}  # name -> {"count", "wall", "cpu", "buckets", "peak"}
+
+    def observe(self, stages) -> None:
+        with self._lock:
+            for name, wall, cpu, peak in stages:
+                entry = self._stages.setdefault(
+                    name, {"count": 0, "wall": 0.0, "cpu": 0.0, "buckets": [0] * len(BUCKETS), "peak": 0}
+                )
+                entry["count"] += 1
+                entry["wall"] += wall
+                entry["cpu"] += cpu
+                for i, bound in enumerate(BUCKETS):
+                    if wall <= bound:
+                        entry["buckets"][i] += 1
+                if peak is not None:
+                    entry["peak"] = max(entry["peak"], peak)
+
+    def render_prometheus(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {name: dict(entry, buckets=list(entry["buckets"])) for name, entry in self._stages.items()}
+
+        lines = [
+            "# HELP tracker_stage_seconds Wall time spent in each analyze pipeline stage.",
+            "# TYPE tracker_stage_seconds histogram",
+        ]
+        for name, entry in sorted(stages.items()):
+            for bound, count in zip(BUCKETS, entry["buckets"]):  # already cumulative
+                lines.append(f'tracker_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'tracker_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {entry["count"]}')
+            lines.append(f'tracker_stage_seconds_sum{{stage="{name}"}} {entry["wall"]:.6f}')
+            lines.append(f'tracker_stage_seconds_count{{stage="{name}"}} {entry["count"]}')
+
+        lines += [
+            "# HELP tracker_stage_cpu_seconds_total CPU time spent in each analyze pipeline stage.",
+            "# TYPE tracker_stage_cpu_seconds_total counter",
+        ]
+        for name, entry in sorted(stages.items()):
+            lines.append(f'tracker_stage_cpu_seconds_total{{stage="{name}"}} {entry["cpu"]:.6f}')
+
+        lines += [
+            "# HELP tracker_stage_peak_memory_bytes Highest traced memory seen in a stage of a sampled request.",
+            "# TYPE tracker_stage_peak_memory_bytes gauge",
+        ]
+        for name, entry in sorted(stages.items()):
+            lines.append(f'tracker_stage_peak_memory_bytes{{stage="{name}"}} {entry["peak"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = StageMetrics()
+
+
+def server_timing(stages) -> str:
+    """Format recorded stages as a Server-Timing header value."""
+    return ", ".join(
+        f'{name};dur={wall * 1000:.2f};desc="cpu {cpu * 1000:.2f}ms"'
+        for name, wall, cpu, _ in stages
+    )
+
+
+def init_app(app) -> None:
+    """
+    Register the request hooks that drive instrumentation.
+
+    Config:
+        INSTRUMENTATION: record stages for every request (default False)
+        PROFILE_SAMPLE_RATE: fraction of instrumented requests to profile (default 0)
+        PROFILE_DIR: where sampled cProfile/tracemalloc dumps are written
+    """
+    app.config.setdefault('INSTRUMENTATION', False)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+
+    from flask import g
+
+    @app.before_request
+    def start_instrumentation():
+        if not app.config['INSTRUMENTATION']:
+            return
+
+        sampled = random.random() < app.config['PROFILE_SAMPLE_RATE']
+        g.stage_recorder = StageRecorder(trace_memory=sampled)
+        g.stage_token = _recorder.set(g.stage_recorder)
+        g.profiler = None
+        if sampled:
+            _acquire_tracing()
+            g.tracing = True
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_instrumentation(response):
+        recorder = g.pop('stage_recorder', None)
+        if recorder is None:
+            return response
+
+        _recorder.reset(g.pop('stage_token'))
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            try:
+                _dump_profile(app.config['PROFILE_DIR'], profiler)
+            except Exception:
+                # A failed profile dump must never change the response
+                app.logger.exception("Failed to write profile")
+
+        if recorder.stages:
+            metrics.observe(recorder.stages)
+            response.headers['Server-Timing'] = server_timing(recorder.stages)
+        return response
+
+    @app.teardown_request
+    def finish_tracing(exc):
+        # Here rather than in after_request, which an unhandled error skips
+        if g.pop('tracing', False):
+            _release_tracing()
+
+
+def _acquire_tracing() -> None:
+    global _tracing_requests
+    with _tracing_lock:
+        if _tracing_requests == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_requests += 1
+
+
+def _release_tracing() -> None:
+    global _tracing_requests
+    with _tracing_lock:
+        _tracing_requests -= 1
+        if _tracing_requests == 0:
+            tracemalloc.stop()
+
+
+def _dump_profile(profile_dir: str, profiler: cProfile.Profile) -> None:
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}")
+    profiler.dump_stats(f"{base}.prof")
+
+    snapshot = tracemalloc.take_snapshot()
+    with open(f"{base}.tracemalloc.txt", "w", encoding="utf8") as f:
+        for stat in snapshot.statistics("lineno")[:50]:
+            f.write(f"{stat}\n")
@@ -0,0 +1,162 @@
+"""
+Item catalogue: id to display name resolution shared by the trackers and CLIs.
+
+The catalogue is built once with the game data from:
+- data/object_names.json, base object names (raw materials, crops, forage)
+  that the unpacked data in this repository does not carry
+- names derived from the unpacked data itself: fish ids, cooked dish ids and
+  crafted item ids, so new recipes and fish resolve without code changes
+- CATEGORY_NAMES, the negative category codes recipes accept ("any fish")
+
+Base names win over derived ones, since some recipe names differ from the
+item they produce (e.g. "Transmute (Fe)" makes an Iron Bar).
+
+Ids are stored the way recipes and saves write them: objects unqualified
+("388", "Moss"), big craftables as "(BC)<id>", categories as "-4". Lookups
+accept the "(O)" qualifier too.
+"""
+import json
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+
+OBJECT_NAMES_PATH = os.path.join(os.path.dirname(__file__), "data", "object_names.json")
+
+# Unpacked game data files names are derived from
+DATA_FILES = ("CookingRecipes.json", "CraftingRecipes.json", "Fish.json")
+
+# Item kinds
+OBJECT = 0
+BIG_CRAFTABLE = 1
+CATEGORY = 2
+
+KIND_NAMES = ("object", "big_craftable", "category")
+
+# Object category codes used as "any item of this category" ingredients
+CATEGORY_NAMES = {
+    "-2": "Any Gem",
+    "-4": "Any Fish",
+    "-5": "Any Egg",
+    "-6": "Any Milk",
+    "-75": "Any Vegetable",
+    "-79": "Any Fruit",
+    "-81": "Any Forage",
+    "-777": "Any Wild Seeds",
+}
+
+
+def load_object_names() -> dict:
+    with open(OBJECT_NAMES_PATH, "r", encoding="utf8") as f:
+        return json.load(f)
+
+
+def canonical_id(item_id: str) -> str:
+    """The id the catalogue stores an item under: "(O)388" -> "388", others unchanged."""
+    if item_id.startswith("(O)"):
+        return item_id[3:]
+    return item_id
+
+
+def kind_of(item_id: str) -> int:
+    """Item kind of a canonical id."""
+    if item_id.startswith("(BC)"):
+        return BIG_CRAFTABLE
+    if item_id.startswith("-"):
+        return CATEGORY
+    return OBJECT
+
+
+class ItemCatalog(Mapping):
+    """
+    Read-only {canonical item id: display name} mapping.
+
+    Stored as one id -> slot dict over two parallel columns: a tuple of names
+    and a byte array of item kinds. Ids and names are interned, so the many
+    recipes and fish that share a name string point at a single object.
+    """
+
+    __slots__ = ("_slots", "_names", "_kinds")
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: iterable of (canonical id, name) pairs, ids unique
+        """
+        slots = {}
+        names = []
+        kinds = array("B")
+        for item_id, name in entries:
+            slots[sys.intern(item_id)] = len(names)
+            names.append(sys.intern(name))
+            kinds.append(kind_of(item_id))
+        self._slots = slots
+        self._names = tuple(names)
+        self._kinds = kinds
+
+    def __reduce__(self):
+        # Rebuild on unpickle so the loaded strings are interned again
+        return ItemCatalog, (tuple(zip(self._slots, self._names)),)
+
+    def __getitem__(self, item_id):
+        return self._names[self._slots[canonical_id(item_id)]]
+
+    def __contains__(self, item_id):
+        return isinstance(item_id, str) and canonical_id(item_id) in self._slots
+
+    def __iter__(self):
+        return iter(self._slots)
+
+    def __len__(self):
+        return len(self._names)
+
+    def name(self, item_id: str) -> str:
+        """Display name for an item id, or a placeholder naming the unknown id."""
+        slot = self._slots.get(canonical_id(item_id))
+        if slot is None:
+            return f"Unknown ({item_id})"
+        return self._names[slot]
+
+    def kind(self, item_id: str) -> str | None:
+        """"object", "big_craftable" or "category", or None for unknown ids."""
+        slot = self._slots.get(canonical_id(item_id))
+        if slot is None:
+            return None
+        return KIND_NAMES[self._kinds[slot]]
+
+    def qualified_id(self, item_id: str) -> str:
+        """Fully qualified id: "(O)388", "(BC)13"; category codes stay bare."""
+        item_id = canonical_id(item_id)
+        if kind_of(item_id) == OBJECT:
+            return f"(O){item_id}"
+        return item_id
+
+
+def build_item_catalog(tables: dict) -> ItemCatalog:
+    """
+    Build the item catalogue.
+
+    Args:
+        tables: {data file: "content" dict of the unpacked JSON} for DATA_FILES
+    """
+    names = {}
+
+    for fish_id, fish_string in tables["Fish.json"].items():
+        names[fish_id] = fish_string.split("/")[0]
+
+    for name, recipe_str in tables["CookingRecipes.json"].items():
+        parts = recipe_str.strip("/").split("/")
+        if len(parts) >= 3:
+            names[parts[2].split()[0]] = name
+
+    # Big craftables live in their own id space, qualified as "(BC)<id>"
+    for name, recipe_str in tables["CraftingRecipes.json"].items():
+        parts = recipe_str.split("/")
+        output_id = parts[2].split()[0]
+        if parts[3] == "true":
+            output_id = f"(BC){output_id}"
+        names.setdefault(output_id, name)
+
+    names.update(load_object_names())
+    names.update(CATEGORY_NAMES)
+    return ItemCatalog(names.items())
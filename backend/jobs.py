@@ -0,0 +1,101 @@
+"""
+Background analysis jobs.
+
+Uploads submitted through /api/jobs are analyzed on a small thread pool owned
+by the worker process instead of inside the request, so slow parses never tie
+up the request workers. Job state is kept in the analysis_jobs table so any
+worker can answer a status poll. Finished jobs are deleted once they are older
+than the queue's retention, so result JSON does not pile up in the table.
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, AnalysisJob
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobQueue:
+    """Thread pool that runs analysis jobs with bounded concurrency and queue depth."""
+
+    def __init__(self, app, handler, workers: int = 2, queue_depth: int = 8,
+                 retention: timedelta = timedelta(hours=24)):
+        """
+        Args:
+            app: Flask app whose context the jobs run in
+            handler: Callable taking the upload stream and returning the result dict
+            workers: Jobs analyzed concurrently by this process
+            queue_depth: Jobs allowed to wait for a free worker before submissions are rejected
+            retention: How long a finished job (and its result) can still be polled
+        """
+        self.app = app
+        self.handler = handler
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def submit(self, stream) -> AnalysisJob:
+        """Queue stream for analysis and return its job. Raises QueueFull at capacity."""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull()
+
+        try:
+            job = AnalysisJob(id=uuid.uuid4().hex, state=AnalysisJob.QUEUED)
+            db.session.add(job)
+            prune_jobs(datetime.utcnow() - self.retention)
+            db.session.commit()
+            self._executor.submit(self._run, job.id, stream)
+        except Exception:
+            self._slots.release()
+            raise
+        return job
+
+    def _run(self, job_id: str, stream):
+        try:
+            with self.app.app_context():
+                job = db.session.get(AnalysisJob, job_id)
+                job.state = AnalysisJob.RUNNING
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+
+                try:
+                    job.result = self.handler(stream)
+                    job.state = AnalysisJob.SUCCEEDED
+                except Exception as e:
+                    db.session.rollback()
+                    job.error = str(e)
+                    job.state = AnalysisJob.FAILED
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+        finally:
+            stream.close()
+            self._slots.release()
+
+
+def prune_jobs(before: datetime) -> int:
+    """Delete jobs that finished before `before`; returns how many. The caller commits."""
+    return AnalysisJob.query.filter(AnalysisJob.finished_at < before).delete(synchronize_session=False)
+
+
+def fail_orphaned_jobs() -> int:
+    """
+    Mark jobs still queued or running as failed; returns how many.
+
+    Jobs only run in the process that accepted them, so any left unfinished
+    when the workers start belonged to a process that has since exited. Call
+    this before any worker starts, never while jobs may be running.
+    """
+    orphaned = AnalysisJob.query.filter(AnalysisJob.state.in_((AnalysisJob.QUEUED, AnalysisJob.RUNNING))).update(
+        {
+            AnalysisJob.state: AnalysisJob.FAILED,
+            AnalysisJob.error: "The server restarted before the analysis finished",
+            AnalysisJob.finished_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return orphaned
@@ -0,0 +1,179 @@
+"""
+Localized display names for analysis results, loaded lazily per locale.
+
+The unpacked game data ships localized variants of its files next to the
+English ones (e.g. "Bundles.fr-FR.json"). A localized variant of a slash
+delimited data file carries the same entries with the translated display name
+appended as an extra last field. For the data files item and recipe names come
+from (see items.DATA_FILES), that field is read when a locale variant exists;
+data/object_names.<locale>.json, when present, translates the base object
+names the same way data/object_names.json provides them in English.
+Localized bundle files instead replace the English display name in place.
+Anything without a translation keeps its English name.
+
+A locale is supported only if it has translated item, recipe or bundle
+names; anything it lacks falls back to English. One with nothing but, say,
+localized mail or dialogue is rejected rather than served in English.
+
+Nothing is read until a locale is first requested, and only the most recently
+used LOCALE_CACHE_SIZE locales are kept, so a worker's memory does not grow
+with the number of languages served.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+import items
+from game_data import DATA_DIR, get_game_data, load_table
+
+DEFAULT_LOCALE = "en-US"
+
+# The data file bundle names are localized from
+BUNDLES_FILE = "Bundles.json"
+
+# Locales whose strings are kept in memory per worker process
+LOCALE_CACHE_SIZE = 4
+
+_LOCALE_SUFFIX = re.compile(r"\.([a-z]{2}-[A-Z]{2})\.json$")
+
+
+@dataclass(frozen=True)
+class LocaleStrings:
+    """Translated names for one locale, falling back to the English name."""
+    locale: str
+    items: Mapping[str, str]    # canonical item id -> display name
+    recipes: Mapping[str, str]  # English recipe name -> display name
+    bundles: Mapping[str, str]  # English bundle name -> display name
+
+    def item(self, item_id: str, default: str) -> str:
+        return self.items.get(items.canonical_id(item_id), default)
+
+    def recipe(self, name: str) -> str:
+        return self.recipes.get(name, name)
+
+    def bundle(self, name: str) -> str:
+        return self.bundles.get(name, name)
+
+
+@lru_cache(maxsize=None)
+def available_locales() -> frozenset:
+    """
+    Locale codes there are translated item, recipe or bundle names for.
+
+    Those are the locales with a variant of one of items.DATA_FILES, of
+    Bundles.json or of data/object_names.json. Localized files that carry no
+    names shown in results (mail, dialogue, ...) do not make a locale supported.
+    """
+    object_names_dir, object_names_file = os.path.split(items.OBJECT_NAMES_PATH)
+    return _locales_of(DATA_DIR, (*items.DATA_FILES, BUNDLES_FILE)) | _locales_of(object_names_dir, (object_names_file,))
+
+
+def _locales_of(directory: str, names) -> set:
+    stems = {os.path.splitext(name)[0] for name in names}
+    return {
+        match.group(1)
+        for name in os.listdir(directory)
+        if (match := _LOCALE_SUFFIX.search(name)) and name[:match.start()] in stems
+    }
+
+
+def resolve_locale(lang: str | None) -> str | None:
+    """
+    Map a requested language ("ja-JP", "ja", "pt_br") to a supported locale.
+
+    Returns None for English (the default), and raises ValueError for a
+    language there is no localized data for.
+    """
+    if not lang:
+        return None
+    lang = lang.strip().replace("_", "-").lower()
+    if lang == "en" or lang.startswith("en-"):
+        return None
+
+    for locale in sorted(available_locales()):
+        if locale.lower() == lang or locale.lower().split("-")[0] == lang:
+            return locale
+    raise ValueError(f"Unsupported language: {lang}")
+
+
+def load_localized_table(name: str, locale: str) -> dict | None:
+    """Load the "content" dict of a data file's locale variant, or None if it has none."""
+    stem, ext = os.path.splitext(name)
+    try:
+        return load_table(f"{stem}.{locale}{ext}")
+    except FileNotFoundError:
+        return None
+
+
+def display_names(english: dict, localized: dict) -> dict:
+    """{key: translated display name} from the extra last field of localized entries."""
+    names = {}
+    for key, value in localized.items():
+        fields = value.split("/")
+        if key in english and len(fields) > len(english[key].split("/")) and fields[-1]:
+            names[key] = fields[-1]
+    return names
+
+
+def build_locale_strings(locale: str) -> LocaleStrings:
+    """Read every translation source for locale."""
+    item_names = {}
+    recipe_names = {}
+
+    for name in items.DATA_FILES:
+        localized = load_localized_table(name, locale)
+        if localized is None:
+            continue
+        english = load_table(name)
+        translated = display_names(english, localized)
+
+        if name == "Fish.json":
+            item_names.update(translated)
+            continue
+
+        # Recipe tables: the translated name is both the recipe's and its output's
+        recipe_names.update(translated)
+        for recipe_name, display_name in translated.items():
+            parts = english[recipe_name].strip("/").split("/")
+            output_id = parts[2].split()[0]
+            if name == "CraftingRecipes.json" and parts[3] == "true":
+                output_id = f"(BC){output_id}"
+            item_names.setdefault(output_id, display_name)
+
+    # Localized bundles replace the display name (the last field) rather than adding one
+    bundle_names = {}
+    localized = load_localized_table(BUNDLES_FILE, locale)
+    if localized is not None:
+        english = load_table(BUNDLES_FILE)
+        for key, value in localized.items():
+            if key in english:
+                bundle_names[english[key].split("/")[-1]] = value.split("/")[-1]
+
+    stem, ext = os.path.splitext(items.OBJECT_NAMES_PATH)
+    try:
+        with open(f"{stem}.{locale}{ext}", "r", encoding="utf8") as f:
+            item_names.update(json.load(f))
+    except FileNotFoundError:
+        pass
+
+    return LocaleStrings(
+        locale=locale,
+        items=MappingProxyType(item_names),
+        recipes=MappingProxyType(recipe_names),
+        bundles=MappingProxyType(bundle_names),
+    )
+
+
+@lru_cache(maxsize=LOCALE_CACHE_SIZE)
+def _cached_locale_strings(locale: str, version: str) -> LocaleStrings:
+    # version keys the cache on the game data, so a data update reloads translations
+    return build_locale_strings(locale)
+
+
+def get_locale_strings(locale: str) -> LocaleStrings:
+    """Translated names for a supported locale, loaded on first use."""
+    return _cached_locale_strings(locale, get_game_data().version)
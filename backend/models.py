@@ -1,16 +1,51 @@
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
 from datetime import datetime
 
 db = SQLAlchemy()
 
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer, and synchronous=NORMAL is durable under WAL while skipping
+# an fsync on every commit.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+}
+
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 
 class Save(db.Model):
     """Represents a single save file upload."""
     __tablename__ = "saves"
+    # "Previous upload of this farm" is a single seek on (farm_id, id)
+    __table_args__ = (
+        db.Index("ix_saves_farm_id_id", "farm_id", "id"),
+        db.Index("ix_saves_keyframe_id_id", "keyframe_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # sha256 of the decompressed save (uploads.save_digest)
+    farm_id = db.Column(db.String(32))  # see app.farm_id_for
+    catalog_id = db.Column(db.Integer, db.ForeignKey("snapshot_catalogs.id"))
 
+    # Position in the farm's delta-encoded snapshot chain (see snapshots.py)
+    keyframe_id = db.Column(db.Integer)    # save holding the chain's full snapshot
+    parent_id = db.Column(db.Integer)      # previous save in the chain, None for keyframes
+    chain_index = db.Column(db.SmallInteger)  # 0 for keyframes
+
+    # Legacy row-per-item snapshots, superseded by snapshot_words
     fish_snapshots = db.relationship("FishSnapshot", backref="save", lazy=True)
     recipe_snapshots = db.relationship("RecipeSnapshot", backref="save", lazy=True)
 
@@ -21,6 +56,7 @@ class Save(db.Model):
 class FishSnapshot(db.Model):
     """Records which fish were caught at the time of a given upload."""
     __tablename__ = "fish_snapshots"
+    __table_args__ = (db.Index("ix_fish_snapshots_save_fish", "save_id", "fish_id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     save_id = db.Column(db.Integer, db.ForeignKey("saves.id"), nullable=False)
@@ -35,6 +71,7 @@ class FishSnapshot(db.Model):
 class RecipeSnapshot(db.Model):
     """Records which recipes were learned/cooked at the time of a given upload."""
     __tablename__ = "recipe_snapshots"
+    __table_args__ = (db.Index("ix_recipe_snapshots_save_recipe", "save_id", "recipe_name"),)
 
     id = db.Column(db.Integer, primary_key=True)
     save_id = db.Column(db.Integer, db.ForeignKey("saves.id"), nullable=False)
@@ -44,3 +81,119 @@ class RecipeSnapshot(db.Model):
 
     def __repr__(self):
         return f"<RecipeSnapshot recipe_name={self.recipe_name} cooked={self.cooked}>"
+
+
+class SnapshotCatalog(db.Model):
+    """A versioned, canonical ordering of game items that snapshot bits refer to."""
+    __tablename__ = "snapshot_catalogs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(64), unique=True, nullable=False)
+    fish_ids = db.Column(db.JSON, nullable=False)      # bit i -> fish id
+    recipe_names = db.Column(db.JSON, nullable=False)  # bit i -> recipe name
+
+    def __repr__(self):
+        return f"<SnapshotCatalog version={self.version}>"
+
+
+class SnapshotWord(db.Model):
+    """
+    One word of a snapshot bitset.
+
+    Each snapshot stores caught fish, learned recipes and cooked recipes as
+    bitsets over its catalog's ordering, split into words. Keyframe saves
+    have every word; the other saves in a chain only the words that changed
+    since their parent.
+    """
+    __tablename__ = "snapshot_words"
+
+    save_id = db.Column(db.Integer, db.ForeignKey("saves.id"), primary_key=True)
+    kind = db.Column(db.SmallInteger, primary_key=True)   # see snapshots.FISH_CAUGHT etc.
+    word = db.Column(db.SmallInteger, primary_key=True)   # word index within the bitset
+    bits = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<SnapshotWord save_id={self.save_id} kind={self.kind} word={self.word}>"
+
+
+class ProgressRollup(db.Model):
+    """
+    Progress counts of one upload, written alongside its snapshot.
+
+    The farm timeline reads these rows directly instead of decoding every
+    snapshot in the farm's history.
+    """
+    __tablename__ = "progress_rollups"
+    __table_args__ = (db.Index("ix_progress_rollups_farm_id_save_id", "farm_id", "save_id"),)
+
+    save_id = db.Column(db.Integer, db.ForeignKey("saves.id"), primary_key=True)
+    farm_id = db.Column(db.String(32))
+    uploaded_at = db.Column(db.DateTime, nullable=False)
+    fish_caught = db.Column(db.Integer, nullable=False)
+    fish_total = db.Column(db.Integer, nullable=False)
+    recipes_learned = db.Column(db.Integer, nullable=False)
+    recipes_cooked = db.Column(db.Integer, nullable=False)
+    recipes_total = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ProgressRollup save_id={self.save_id} farm_id={self.farm_id}>"
+
+
+class CachedResult(db.Model):
+    """Persistent tier of the analysis result cache, keyed by upload hash."""
+    __tablename__ = "cached_results"
+
+    cache_key = db.Column(db.String(128), primary_key=True)
+    result = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CachedResult cache_key={self.cache_key} created_at={self.created_at}>"
+
+
+class AnalysisJob(db.Model):
+    """A save analysis submitted to the background job queue."""
+    __tablename__ = "analysis_jobs"
+    # Retention pruning is a range delete on finished_at
+    __table_args__ = (db.Index("ix_analysis_jobs_finished_at", "finished_at"),)
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    id = db.Column(db.String(32), primary_key=True)
+    state = db.Column(db.String(16), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
+    def __repr__(self):
+        return f"<AnalysisJob id={self.id} state={self.state}>"
+
+
+def upgrade_schema():
+    """
+    Bring an existing database up to date with the models.
+
+    db.create_all() only creates missing tables, so columns and indexes added
+    to a model after its table was first created are added here.
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=conn.dialect)
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    ))
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
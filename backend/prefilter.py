@@ -0,0 +1,214 @@
+"""
+Byte-level prefilter that cuts a save down to the parts the trackers read.
+
+Most of a save is the <locations> subtree, of which the trackers read only a
+sliver. Rather than have the XML parser tokenize all of it, the prefilter
+walks the root element's children over the raw bytes (a memory map for files
+on disk) with plain substring searches: for each child it finds the matching
+end tag and skips straight past it. Only the root children the trackers'
+save_paths start with are copied out, wrapped in the original root start tag,
+and handed to the parser as a much smaller document. Where a save path goes
+deeper (e.g. "locations/GameLocation/bundles"), the walk descends into that
+child the same way and keeps only the matching elements, in their enclosing
+start and end tags.
+
+Anything the walk does not recognise (a missing root, unbalanced tags,
+content after the root) raises PrefilterMiss, and the caller falls back to
+parsing the full save.
+"""
+import io
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+from uploads import SpooledUpload
+
+ROOT_TAG = b"SaveGame"
+
+# Start tag of an element: (name, "/" when self-closing)
+_START_TAG = re.compile(rb"<([A-Za-z_][\w.\-]*)(?:\s[^>]*?)?(/?)>")
+_NAME_END = frozenset(b" \t\r\n/>")
+
+
+class PrefilterMiss(Exception):
+    """The save does not have the layout the prefilter expects."""
+
+
+def element_end(buf, name: bytes, pos: int) -> int:
+    """
+    Offset just past the end tag closing an element.
+
+    Args:
+        buf: Save bytes
+        name: Element name
+        pos: Offset just past the element's start tag
+    """
+    open_tag = b"<" + name
+    close_tag = b"</" + name + b">"
+    depth = 1
+    while True:
+        close = buf.find(close_tag, pos)
+        if close < 0:
+            raise PrefilterMiss(f"Unclosed <{name.decode()}>")
+
+        # Same-named elements nested inside this one
+        nested = buf.find(open_tag, pos, close)
+        while nested >= 0:
+            after = nested + len(open_tag)
+            if buf[after] in _NAME_END:
+                tag_end = buf.find(b">", after)
+                if buf[tag_end - 1] != ord("/"):
+                    depth += 1
+            nested = buf.find(open_tag, after, close)
+
+        depth -= 1
+        pos = close + len(close_tag)
+        if depth == 0:
+            return pos
+
+
+def child_elements(buf, name: bytes, pos: int):
+    """
+    Walk the child elements of an element.
+
+    Args:
+        buf: Save bytes
+        name: Element name
+        pos: Offset just past the element's start tag
+
+    Returns:
+        ([(name, start offset, content offset, end offset)], offset of the
+        element's end tag). The content offset is just past the child's start
+        tag, and equals its end offset when it is self-closing.
+    """
+    close_tag = b"</" + name + b">"
+    children = []
+    while True:
+        pos = buf.find(b"<", pos)
+        if pos < 0:
+            raise PrefilterMiss(f"Unclosed <{name.decode()}>")
+        if buf[pos:pos + len(close_tag)] == close_tag:
+            return children, pos
+
+        match = _START_TAG.match(buf, pos)
+        if match is None:
+            raise PrefilterMiss(f"Unexpected markup at byte {pos}")
+        child, self_closing = match.groups()
+        end = match.end() if self_closing else element_end(buf, child, match.end())
+        children.append((child.decode(), pos, match.end(), end))
+        pos = end
+
+
+def root_children(buf):
+    """
+    Walk the children of the root element.
+
+    Returns:
+        (root start tag bytes, [(name, start offset, content offset, end offset)])
+    """
+    root = buf.find(b"<" + ROOT_TAG)
+    if root < 0:
+        raise PrefilterMiss("No <SaveGame> root")
+    pos = buf.find(b">", root) + 1
+    root_start_tag = buf[root:pos]
+
+    children, pos = child_elements(buf, ROOT_TAG, pos)
+    if buf[pos + len(ROOT_TAG) + 3:].strip():
+        raise PrefilterMiss("Content after </SaveGame>")
+    return root_start_tag, children
+
+
+def path_tree(paths) -> dict:
+    """
+    Nest save paths by segment: ["player", "locations/GameLocation/bundles"]
+    -> {"player": None, "locations": {"GameLocation": {"bundles": None}}}.
+
+    None marks an element that is kept whole.
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        *parents, last = path.split("/")
+        for tag in parents:
+            if tag in node and node[tag] is None:
+                break  # an enclosing element is already kept whole
+            node = node.setdefault(tag, {})
+        else:
+            node[last] = None
+    return tree
+
+
+def prefilter(buf, paths) -> bytes:
+    """
+    Build a document holding only the elements at the given save paths.
+
+    Args:
+        buf: Save bytes (bytes, memoryview or mmap)
+        paths: Paths relative to the root to keep, e.g. {"player"}
+    """
+    root_start_tag, children = root_children(buf)
+    parts = [root_start_tag]
+    _keep(buf, children, path_tree(paths), parts)
+    parts.append(b"</" + ROOT_TAG + b">")
+    return b"".join(parts)
+
+
+def _keep(buf, children, tree: dict, parts: list) -> None:
+    for name, start, content, end in children:
+        if name not in tree:
+            continue
+        subtree = tree[name]
+        if subtree is None or content == end:
+            parts.append(buf[start:end])
+            continue
+        parts.append(buf[start:content])
+        grandchildren, close = child_elements(buf, name.encode(), content)
+        _keep(buf, grandchildren, subtree, parts)
+        parts.append(buf[close:end])
+
+
+@contextmanager
+def save_buffer(source):
+    """
+    Yield the whole save as a bytes-like buffer without reparsing it.
+
+    Files on disk are memory mapped. Streams held in memory are read out.
+    Seekable streams are left at their start position. Yields None for
+    sources that can only be streamed, such as a decompressing reader, which
+    are left untouched.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            with _map(f) as buf:
+                yield buf
+        return
+
+    if isinstance(source, SpooledUpload) and not source.on_disk:
+        data = source.read()
+        source.seek(0)
+        yield data
+    elif isinstance(source, io.BytesIO):
+        yield source.getvalue()
+    elif isinstance(source, (SpooledUpload, io.BufferedReader, io.FileIO)) and _has_fileno(source):
+        with _map(source) as buf:
+            yield buf
+    else:
+        yield None
+
+
+def _has_fileno(f) -> bool:
+    try:
+        f.fileno()
+    except OSError:  # e.g. a BufferedReader over an in-memory stream
+        return False
+    return True
+
+
+@contextmanager
+def _map(f):
+    if os.fstat(f.fileno()).st_size == 0:
+        yield b""
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        yield buf
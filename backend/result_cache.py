@@ -0,0 +1,76 @@
+"""
+Cache of analysis results keyed by the hash of the uploaded save.
+
+Users re-upload the same save repeatedly (refreshes, retries, switching
+browsers), so identical saves are answered from the cache instead of being
+parsed again. The hash is of the decompressed save, so a save uploaded plain
+and compressed shares one entry.
+
+The in-process tier is a bounded LRU with a TTL; an optional persistent tier
+stores results in the database so they survive restarts and are shared
+between workers.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from models import db, CachedResult
+
+
+class ResultCache:
+    """Bounded LRU + TTL cache with an optional SQLite-backed second tier."""
+
+    def __init__(self, max_entries: int = 128, ttl: int = 3600, persistent: bool = False):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent = persistent
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached result for key, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return result
+                del self._entries[key]
+
+        if not self.persistent:
+            return None
+
+        # Persistent tier (requires an app context)
+        row = db.session.get(CachedResult, key)
+        if row is None:
+            return None
+        if row.created_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+            db.session.delete(row)
+            db.session.commit()
+            return None
+
+        self._remember(key, row.result)
+        return row.result
+
+    def put(self, key: str, result: dict) -> None:
+        """Store result under key in every enabled tier."""
+        self._remember(key, result)
+
+        if self.persistent:
+            db.session.merge(CachedResult(cache_key=key, result=result, created_at=datetime.utcnow()))
+            db.session.commit()
+
+    def clear(self) -> None:
+        """Drop every entry from the in-process tier."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
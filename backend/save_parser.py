@@ -1,284 +1,213 @@
-import json
+import io
 import xml.etree.ElementTree as ET
 
-COOKING_JSON_PATH = "../xnbcli-macos/unpacked/CookingRecipes.json"
-FISH_JSON_PATH = "../xnbcli-macos/unpacked/Fish.json"
-
-# Item ID to name mapping for cooking ingredients
-ITEM_NAMES = {
-    "-4": "Any Fish",
-    "-5": "Any Egg",
-    "-6": "Any Milk",
-    "16": "Wild Horseradish",
-    "20": "Leek",
-    "22": "Dandelion",
-    "24": "Parsnip",
-    "78": "Cave Carrot",
-    "88": "Coconut",
-    "91": "Banana",
-    "130": "Tuna",
-    "131": "Sardine",
-    "132": "Bream",
-    "136": "Largemouth Bass",
-    "138": "Rainbow Trout",
-    "139": "Salmon",
-    "142": "Carp",
-    "145": "Sunfish",
-    "148": "Eel",
-    "151": "Squid",
-    "152": "Seaweed",
-    "153": "Green Algae",
-    "154": "Sea Cucumber",
-    "157": "White Algae",
-    "188": "Green Bean",
-    "190": "Cauliflower",
-    "192": "Potato",
-    "194": "Fried Egg",
-    "216": "Bread",
-    "229": "Tortilla",
-    "245": "Sugar",
-    "246": "Wheat Flour",
-    "247": "Oil",
-    "248": "Garlic",
-    "250": "Kale",
-    "252": "Rhubarb",
-    "254": "Melon",
-    "256": "Tomato",
-    "257": "Morel",
-    "258": "Blueberry",
-    "259": "Fiddlehead Fern",
-    "260": "Hot Pepper",
-    "264": "Radish",
-    "266": "Red Cabbage",
-    "267": "Flounder",
-    "269": "Midnight Carp",
-    "270": "Corn",
-    "272": "Eggplant",
-    "274": "Artichoke",
-    "276": "Pumpkin",
-    "278": "Bok Choy",
-    "280": "Yam",
-    "282": "Cranberries",
-    "284": "Beet",
-    "300": "Amaranth",
-    "306": "Mayonnaise",
-    "308": "Void Egg",
-    "372": "Clam",
-    "376": "Poppy",
-    "395": "Coffee",
-    "404": "Common Mushroom",
-    "406": "Wild Plum",
-    "408": "Hazelnut",
-    "410": "Blackberry",
-    "412": "Winter Root",
-    "419": "Vinegar",
-    "423": "Rice",
-    "424": "Cheese",
-    "597": "Blue Jazz",
-    "613": "Apple",
-    "634": "Apricot",
-    "715": "Lobster",
-    "716": "Crayfish",
-    "717": "Crab",
-    "719": "Mussel",
-    "720": "Shrimp",
-    "721": "Snail",
-    "722": "Periwinkle",
-    "724": "Maple Syrup",
-    "814": "Squid Ink",
-    "829": "Ginger",
-    "830": "Taro Root",
-    "832": "Pineapple",
-    "834": "Mango",
-    "Moss": "Moss",
-}
-
-
-def load_cooking_data():
-    """Load cooking recipes from game data."""
-    import os
-    base_path = os.path.dirname(__file__)
-    json_path = os.path.join(base_path, COOKING_JSON_PATH)
-
-    with open(json_path, "r", encoding="utf8") as f:
-        raw = json.load(f)
-
-    data = raw.get("content", raw)
-    recipes = {}
-
-    for name, recipe_str in data.items():
-        parts = recipe_str.strip("/").split("/")
-
-        ing_tokens = parts[0].split()
-        ingredients = []
-        for i in range(0, len(ing_tokens), 2):
-            item_id = ing_tokens[i]
-            quantity = int(ing_tokens[i+1])
-            item_name = ITEM_NAMES.get(item_id, f"Unknown ({item_id})")
-            ingredients.append({"name": item_name, "quantity": quantity})
-
-        output = 1
-        recipe_id = parts[2] if len(parts) >= 3 else None
-
-        recipes[name] = {
-            "ingredients": ingredients,
-            "output": output,
-            "id": recipe_id
-        }
-
-    return recipes
-
-
-def load_fish_data():
-    """Load fish data from game data."""
-    import os
-    base_path = os.path.dirname(__file__)
-    json_path = os.path.join(base_path, FISH_JSON_PATH)
-
-    with open(json_path, "r", encoding="utf8") as f:
-        data = json.load(f)
-
-    fish_dict = {}
-    for fish_id, fish_string in data.get("content", {}).items():
-        name = fish_string.split("/")[0]
-        fish_dict[fish_id] = {"name": name}
-
-    # Add jellies that aren't in Fish.json but count for collection
-    fish_dict["CaveJelly"] = {"name": "Cave Jelly"}
-    fish_dict["RiverJelly"] = {"name": "River Jelly"}
-    fish_dict["SeaJelly"] = {"name": "Sea Jelly"}
-
-    return fish_dict
-
-
-def parse_dict(root, path):
-    """Generic dict reader from the Stardew save format."""
-    result = {}
-    for item in root.findall(f".//{path}/item"):
-        key = item.find("./key/string")
-        val = item.find("./value/int")
-        if key is not None and val is not None:
-            result[key.text] = int(val.text)
-    return result
-
-
-def get_fish_from_save(root):
-    """Extract caught fish from save file."""
-    fish_nodes = root.findall(".//fishCaught")
-
-    if not fish_nodes:
-        return {}
-
-    node = next((n for n in fish_nodes if len(list(n)) > 0), None)
-    if node is None:
-        return {}
-
-    fish = {}
-    for item in node.findall("item"):
-        key_node = item.find("./key/string")
-        val_nodes = item.findall("./value/ArrayOfInt/int")
-
-        if key_node is None or not val_nodes:
-            continue
+from game_data import get_game_data
+from instrumentation import stage
+from prefilter import PrefilterMiss, prefilter, save_buffer
+from trackers import TRACKERS
 
-        fish_id_raw = key_node.text
+# Farmer elements, relative to the SaveGame root: the host, then each farmhand
+PLAYER_PATHS = ("player", "farmhands/Farmer")
 
-        if fish_id_raw.startswith("(O)"):
-            fish_id = fish_id_raw[3:]
-        else:
-            fish_id = fish_id_raw
 
-        caught = int(val_nodes[0].text)
-        fish[fish_id] = caught
+def build_path_trie(trackers):
+    """
+    Index the save paths the dispatcher captures by path segment.
 
-    return fish
+    Each trie node is (children by tag, [(tracker, path)] handled at that node).
+    The root node stands for the SaveGame element itself. Farmer elements
+    (PLAYER_PATHS) are handled with tracker None, and farm-wide trackers at
+    their own save_paths.
+    """
+    root = ({}, [])
+
+    def add(tracker, path):
+        node = root
+        for tag in path.split("/"):
+            node = node[0].setdefault(tag, ({}, []))
+        node[1].append((tracker, path))
+
+    if any(tracker.per_player for tracker in trackers):
+        for path in PLAYER_PATHS:
+            add(None, path)
+    for tracker in trackers:
+        if not tracker.per_player:
+            for path in tracker.save_paths:
+                add(tracker, path)
+    return root
+
+
+def root_paths(trackers) -> list:
+    """Paths, relative to the SaveGame root, of every element the trackers read under."""
+    paths = [path for tracker in trackers if not tracker.per_player for path in tracker.save_paths]
+    if any(tracker.per_player for tracker in trackers):
+        paths.extend(PLAYER_PATHS)
+    return paths
+
+
+def extract_player(elem, trackers, host: bool) -> dict:
+    """Run the per-player trackers' collect() over one Farmer element."""
+    states = {}
+    for tracker in trackers:
+        state = tracker.new_state()
+        for path in tracker.save_paths:
+            for node in elem.iterfind(path):
+                tracker.collect(state, path, node)
+        states[tracker.key] = state
 
+    return {
+        "id": elem.findtext("UniqueMultiplayerID"),
+        "name": elem.findtext("name"),
+        "host": host,
+        "states": states,
+    }
 
-def analyze_save_file(save_file_path):
+
+def extract(source, trackers=TRACKERS) -> dict:
     """
-    Analyze a Stardew Valley save file and return missing fish and recipes.
+    Run every tracker's collect() over a save in a single forward pass.
+
+    The save is read with iterparse rather than built into a full tree. Only
+    Farmer elements and subtrees at one of the farm-wide trackers' save_paths
+    are kept while they are being read; every other element is dropped from
+    its parent as soon as it ends, so peak memory stays flat regardless of
+    save size and adding trackers does not add passes over the save. Paths
+    must not be nested inside one another.
+
+    Once the pass is done, the per-player trackers are run over each farmer:
+    the host, and every farmhand of a co-op save.
 
     Args:
-        save_file_path: Path to the save file
+        source: Path or binary file object of the save file
+        trackers: Trackers to collect for
 
     Returns:
-        dict with analysis results
+        {"players": [{"id", "name", "host", "states": {tracker key: state}}],
+         "farm": {farm-wide tracker key: state}}
     """
-    root = ET.parse(save_file_path).getroot()
-
-    # Load game data
-    game_recipes = load_cooking_data()
-    fish_data = load_fish_data()
-
-    # Get player progress
-    learned_recipes, cooked_recipes = parse_dict(root, "cookingRecipes"), parse_dict(root, "recipesCooked")
-    caught_fish = get_fish_from_save(root)
-
-    # Analyze cooking
-    all_recipes = set(game_recipes.keys())
-    learned_set = set(learned_recipes.keys())
-
-    id_to_name = {info["id"]: name for name, info in game_recipes.items()}
-    cooked_set = set()
-    for fid in cooked_recipes.keys():
-        if fid in id_to_name:
-            cooked_set.add(id_to_name[fid])
-        else:
-            cooked_set.add(fid)
-
-    missing_to_cook = sorted(all_recipes - cooked_set)
-    missing_to_learn = sorted(all_recipes - learned_set)
-
-    # Format missing recipes with ingredients
-    missing_recipes_detailed = []
-    for recipe_name in missing_to_cook:
-        recipe_info = {
-            "name": recipe_name,
-            "ingredients": game_recipes[recipe_name]["ingredients"],
-            "needToLearn": recipe_name in missing_to_learn
-        }
-        missing_recipes_detailed.append(recipe_info)
-
-    # Analyze fish
-    all_fish = set(fish_data.keys())
-    caught_fish_set = set(caught_fish.keys())
-    uncaught_fish = all_fish - caught_fish_set
-
-    missing_fish_detailed = []
-    for fish_id in sorted(uncaught_fish):
-        fish_info = fish_data.get(fish_id)
-        if fish_info:
-            missing_fish_detailed.append({
-                "id": fish_id,
-                "name": fish_info["name"]
-            })
-
-    caught_fish_detailed = []
-    for fish_id in sorted(caught_fish_set):
-        fish_info = fish_data.get(fish_id)
-        if fish_info:
-            caught_fish_detailed.append({
-                "id": fish_id,
-                "name": fish_info["name"]
-            })
-
-    cooked_list = [{"name": name} for name in sorted(cooked_set)]
+    trie = build_path_trie(trackers)
+    player_trackers = [tracker for tracker in trackers if tracker.per_player]
+    farm_states = {tracker.key: tracker.new_state() for tracker in trackers if not tracker.per_player}
+    farmers = []  # (Farmer element, is host)
+
+    stack = []  # (element, trie node or None) for every open element
+    capture_depth = None  # depth of the subtree currently being read
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            node = None
+            if capture_depth is None:
+                if not stack:
+                    node = trie
+                elif stack[-1][1] is not None:
+                    node = stack[-1][1][0].get(elem.tag)
+                if node is not None and node[1]:
+                    capture_depth = len(stack)
+            stack.append((elem, node))
+            continue
 
-    return {
-        "recipes": {
-            "total": len(all_recipes),
-            "learned": len(learned_set),
-            "cooked": len(cooked_set),
-            "missingToLearn": len(missing_to_learn),
-            "missingToCook": len(missing_to_cook),
-            "missingList": missing_recipes_detailed,
-            "cookedList": cooked_list,
-        },
-        "fish": {
-            "total": len(all_fish),
-            "caught": len(caught_fish_set),
-            "uncaught": len(uncaught_fish),
-            "missingList": missing_fish_detailed,
-            "caughtList": caught_fish_detailed,
-        }
-    }
+        _, node = stack.pop()
+        if capture_depth is not None and len(stack) > capture_depth:
+            continue  # keep children until their subtree is complete
+
+        if capture_depth is not None:
+            capture_depth = None
+            for tracker, path in node[1]:
+                if tracker is None:
+                    farmers.append((elem, path == PLAYER_PATHS[0]))
+                else:
+                    tracker.collect(farm_states[tracker.key], path, elem)
+
+        # Finished elements are always the last child of their parent
+        if stack:
+            del stack[-1][0][-1]
+
+    players = [extract_player(elem, player_trackers, host) for elem, host in farmers]
+
+    return {"players": players, "farm": farm_states}
+
+
+def extract_save(source, trackers=TRACKERS) -> dict:
+    """
+    extract() over only the parts of the save the trackers read.
+
+    The save is first cut down by the byte-level prefilter (see prefilter.py)
+    to the elements the trackers read under. If the prefilter does not
+    recognise the save's layout, or the cut-down document does not parse,
+    the full save is parsed instead. Sources that can only be streamed go
+    straight to the full parse.
+    """
+    with save_buffer(source) as buf:
+        if buf is None:
+            return extract(source, trackers)
+        try:
+            return extract(io.BytesIO(prefilter(buf, root_paths(trackers))), trackers)
+        except (PrefilterMiss, ET.ParseError):
+            pass
+
+    # save_buffer() leaves streams rewound
+    return extract(source, trackers)
+
+
+def build_results(extracted: dict, trackers=TRACKERS) -> dict:
+    """
+    Build every tracker's results from an extract() of a save.
+
+    Per-player trackers are reported for the whole farm, counting progress
+    made by any player the way the game's perfection tracker does, and under
+    "players" for the host and each farmhand separately.
+
+    Returns:
+        dict with each tracker's farm-wide results under its key, and
+        "players": [{"id", "name", "host", tracker key: results, ...}]
+    """
+    # Shared game data, loaded once per process
+    with stage("game_data"):
+        game_data = get_game_data()
+
+    with stage("analysis"):
+        players = extracted["players"]
+        player_results = [
+            {
+                tracker.key: tracker.build_result(
+                    player["states"][tracker.key], game_data[tracker.key], game_data.items
+                )
+                for tracker in trackers if tracker.per_player
+            }
+            for player in players
+        ]
+
+        result = {}
+        for tracker in trackers:
+            if not tracker.per_player:
+                state = extracted["farm"][tracker.key]
+            elif len(players) == 1:
+                # Single player: the farm's progress is the host's
+                result[tracker.key] = player_results[0][tracker.key]
+                continue
+            else:
+                state = tracker.merge_states([player["states"][tracker.key] for player in players])
+            result[tracker.key] = tracker.build_result(state, game_data[tracker.key], game_data.items)
+
+        result["players"] = [
+            {"id": player["id"], "name": player["name"], "host": player["host"], **results}
+            for player, results in zip(players, player_results)
+        ]
+        return result
+
+
+def analyze_save_file(source, trackers=TRACKERS):
+    """
+    Analyze a Stardew Valley save file against every perfection tracker.
+
+    Args:
+        source: Path to the save file, or a binary file object (such as an
+            upload stream) that is read incrementally
+        trackers: Trackers to run (default: all of them)
+
+    Returns:
+        build_results() of the save
+    """
+    with stage("parse"):
+        extracted = extract_save(source, trackers)
+    return build_results(extracted, trackers)
@@ -0,0 +1,407 @@
+"""
+Compact snapshot storage.
+
+A snapshot records which fish were caught and which recipes were learned and
+cooked at the time of an upload. Rather than one row per item, each of those
+sets is stored as a bitset over a SnapshotCatalog, a versioned canonical
+ordering of the game's fish and recipes. Bitsets are split into words of
+WORD_BITS bits and stored in snapshot_words.
+
+Between two uploads of a farm only a few items change, so each farm's
+snapshots form delta chains. A keyframe stores every word. Each following
+save stores only the words that differ from its parent, the farm's previous
+save. A new keyframe starts every KEYFRAME_INTERVAL saves, or when the catalog
+changes, so rebuilding any snapshot reads at most one chain.
+
+compact_history() downsamples old history per COMPACTION_POLICY and
+re-encodes the chains it touches.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from models import db, Save, FishSnapshot, ProgressRollup, RecipeSnapshot, SnapshotCatalog, SnapshotWord
+
+# Snapshot kinds (SnapshotWord.kind)
+FISH_CAUGHT = 0
+RECIPE_LEARNED = 1
+RECIPE_COOKED = 2
+KINDS = (FISH_CAUGHT, RECIPE_LEARNED, RECIPE_COOKED)
+
+# SQLite integers are signed 64-bit; 63-bit words keep every word non-negative
+WORD_BITS = 63
+
+# Saves per delta chain, keyframe included
+KEYFRAME_INTERVAL = 16
+
+# (minimum age, bucket) tiers for compact_history: of the uploads at least
+# that old, only the latest per bucket is kept. Younger uploads are all kept.
+COMPACTION_POLICY = (
+    (timedelta(days=30), lambda uploaded_at: uploaded_at.isocalendar()[:2]),  # weekly
+    (timedelta(days=7), lambda uploaded_at: uploaded_at.date()),              # daily
+)
+
+# Per-process caches: catalog version -> id, and id -> decoded orderings
+_catalog_ids = {}
+_catalogs = {}
+
+
+def catalog_orderings(game_data) -> tuple[list, list]:
+    """Canonical item orderings for the given game data."""
+    return sorted(game_data.fish_ids), sorted(game_data.recipes)
+
+
+def get_catalog(game_data) -> int:
+    """Return the id of the catalog matching game_data, creating it if needed."""
+    fish_ids, recipe_names = catalog_orderings(game_data)
+    version = hashlib.sha256(
+        json.dumps([fish_ids, recipe_names]).encode()
+    ).hexdigest()
+    if version in _catalog_ids:
+        return _catalog_ids[version]
+
+    catalog = SnapshotCatalog.query.filter_by(version=version).first()
+    if catalog is None:
+        # Other workers may be creating the same version at the same time
+        try:
+            with db.session.begin_nested():
+                catalog = SnapshotCatalog(version=version, fish_ids=fish_ids, recipe_names=recipe_names)
+                db.session.add(catalog)
+        except IntegrityError:
+            catalog = SnapshotCatalog.query.filter_by(version=version).one()
+        db.session.commit()
+    _catalog_ids[version] = catalog.id
+    return catalog.id
+
+
+def _load_catalog(catalog_id: int) -> tuple:
+    if catalog_id not in _catalogs:
+        catalog = db.session.get(SnapshotCatalog, catalog_id)
+        orderings = (catalog.fish_ids, catalog.recipe_names)
+        indexes = tuple({item: bit for bit, item in enumerate(o)} for o in orderings)
+        _catalogs[catalog_id] = (orderings, indexes)
+    return _catalogs[catalog_id]
+
+
+def ordering_for(catalog_id: int, kind: int) -> list:
+    """Item ordering used by the bitset of the given kind."""
+    orderings, _ = _load_catalog(catalog_id)
+    return orderings[0] if kind == FISH_CAUGHT else orderings[1]
+
+
+def pack(index: dict, members) -> list[int]:
+    """Pack members into a list of WORD_BITS-bit words using index (item -> bit)."""
+    words = [0] * ((len(index) + WORD_BITS - 1) // WORD_BITS)
+    for item in members:
+        bit = index.get(item)
+        if bit is not None:
+            words[bit // WORD_BITS] |= 1 << (bit % WORD_BITS)
+    return words
+
+
+def unpack(ordering: list, words: dict) -> list:
+    """Return the items whose bits are set in words ({word index: bits}), in catalog order."""
+    items = []
+    for word, bits in sorted(words.items()):
+        base = word * WORD_BITS
+        while bits:
+            low = bits & -bits
+            items.append(ordering[base + low.bit_length() - 1])
+            bits ^= low
+    return items
+
+
+def state_from_result(result: dict) -> dict:
+    """Extract the snapshot sets from an analyze_save_file result."""
+    cooked = {r["name"] for r in result["recipes"].get("cookedList", [])}
+    learned = cooked | {
+        r["name"] for r in result["recipes"]["missingList"] if not r["needToLearn"]
+    }
+    return {
+        FISH_CAUGHT: {f["id"] for f in result["fish"].get("caughtList", [])},
+        RECIPE_LEARNED: learned,
+        RECIPE_COOKED: cooked,
+    }
+
+
+def pack_state(catalog_id: int, state: dict) -> dict:
+    """Pack a state ({kind: set of items}) into words ({kind: {word index: bits}})."""
+    _, (fish_index, recipe_index) = _load_catalog(catalog_id)
+    return {
+        kind: dict(enumerate(pack(fish_index if kind == FISH_CAUGHT else recipe_index, state.get(kind, ()))))
+        for kind in KINDS
+    }
+
+
+def chain_rows(save: Save, words: dict, parent: Save | None = None, parent_words: dict | None = None) -> list[dict]:
+    """
+    Place save in a delta chain after parent and build its snapshot_words rows.
+
+    Starts a new chain (save becomes a keyframe and gets every word) when
+    there is no parent, the parent's catalog differs or its chain is full.
+    Otherwise only the words that differ from parent_words are stored.
+
+    Args:
+        save: Save with its id assigned
+        words: save's full snapshot words
+        parent: The farm's previous save, if any
+        parent_words: parent's full snapshot words
+    """
+    if (
+        parent is None
+        or parent.catalog_id != save.catalog_id
+        or parent.keyframe_id is None
+        or parent.chain_index + 1 >= KEYFRAME_INTERVAL
+    ):
+        save.keyframe_id, save.parent_id, save.chain_index = save.id, None, 0
+        parent_words = {kind: {} for kind in KINDS}
+    else:
+        save.keyframe_id, save.parent_id, save.chain_index = parent.keyframe_id, parent.id, parent.chain_index + 1
+
+    keyframe = save.chain_index == 0
+    return [
+        {"save_id": save.id, "kind": kind, "word": word, "bits": bits}
+        for kind in KINDS
+        for word, bits in sorted(words[kind].items())
+        if keyframe or parent_words[kind].get(word, 0) != bits
+    ]
+
+
+def snapshot_values(save_id: int, catalog_id: int, state: dict) -> list[dict]:
+    """Build the full (keyframe) snapshot_words rows for a state ({kind: set of items})."""
+    return [
+        {"save_id": save_id, "kind": kind, "word": word, "bits": bits}
+        for kind, kind_words in pack_state(catalog_id, state).items()
+        for word, bits in kind_words.items()
+    ]
+
+
+def insert_snapshots(rows: list[dict]) -> None:
+    """Bulk-insert snapshot_words rows with a single executemany."""
+    if rows:
+        db.session.execute(insert(SnapshotWord), rows)
+
+
+def load_words(save: Save) -> dict:
+    """
+    Rebuild a save's full snapshot words ({kind: {word index: bits}}).
+
+    Reads the save's chain in one query and applies the deltas from the
+    keyframe down to the save, following parent links.
+    """
+    rows = (
+        db.session.query(Save.id, Save.parent_id, SnapshotWord.kind, SnapshotWord.word, SnapshotWord.bits)
+        .outerjoin(SnapshotWord, SnapshotWord.save_id == Save.id)
+        .filter(Save.keyframe_id == save.keyframe_id, Save.id <= save.id)
+    )
+    parents = {}
+    deltas = {}
+    for save_id, parent_id, kind, word, bits in rows:
+        parents[save_id] = parent_id
+        if kind is not None:
+            deltas.setdefault(save_id, []).append((kind, word, bits))
+
+    chain = []
+    node = save.id
+    while node is not None:
+        chain.append(node)
+        node = parents.get(node)
+
+    words = {kind: {} for kind in KINDS}
+    for save_id in reversed(chain):
+        for kind, word, bits in deltas.get(save_id, ()):
+            words[kind][word] = bits
+    return words
+
+
+def load_state(save: Save, words: dict | None = None) -> dict:
+    """Decode a save's snapshot (or its already loaded words) into {kind: list of items}."""
+    if words is None:
+        words = load_words(save)
+    return {
+        kind: unpack(ordering_for(save.catalog_id, kind), kind_words)
+        for kind, kind_words in words.items()
+    }
+
+
+def snapshot_digest(save: Save, words: dict, *context) -> str:
+    """
+    Content hash of a snapshot, for use as a strong ETag.
+
+    Args:
+        words: The save's snapshot words (see load_words)
+        context: Anything else the rendered representation depends on,
+            such as the game data version and locale
+    """
+    content = [save.catalog_id, [sorted(words[kind].items()) for kind in KINDS], context]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:32]
+
+
+def tracker_states(state: dict) -> dict:
+    """The fish and cooking tracker states a decoded snapshot stands for ({tracker key: state})."""
+    return {
+        "fish": {"caught": dict.fromkeys(state[FISH_CAUGHT], 1)},
+        "recipes": {
+            "learned": dict.fromkeys(state[RECIPE_LEARNED], 1),
+            "cooked": dict.fromkeys(state[RECIPE_COOKED], 1),
+        },
+    }
+
+
+def diff_snapshots(from_save: Save, to_save: Save, kinds=(FISH_CAUGHT, RECIPE_COOKED)) -> dict:
+    """
+    Items set in to_save's snapshot but not in from_save's, per kind.
+
+    When both saves share a catalog the set difference is taken word by word
+    (to & ~from), and only the items in words that differ are decoded. Two
+    keyframes hold every word themselves, so for them this is done in the
+    database and only the differing words come back. Other saves first have
+    their words rebuilt from their chains. Saves encoded against different
+    catalogs are decoded and compared item by item instead.
+
+    Returns:
+        {kind: list of items in catalog order}
+    """
+    if from_save.catalog_id == to_save.catalog_id and is_keyframe(from_save) and is_keyframe(to_save):
+        return _diff_keyframes(from_save, to_save, kinds)
+
+    before, after = load_words(from_save), load_words(to_save)
+
+    if from_save.catalog_id != to_save.catalog_id:
+        before, after = load_state(from_save, before), load_state(to_save, after)
+        added = {}
+        for kind in kinds:
+            seen = set(before[kind])
+            added[kind] = [item for item in after[kind] if item not in seen]
+        return added
+
+    added = {}
+    for kind in kinds:
+        previous = before[kind]
+        words = {word: bits & ~previous.get(word, 0) for word, bits in after[kind].items()}
+        added[kind] = unpack(
+            ordering_for(to_save.catalog_id, kind),
+            {word: bits for word, bits in words.items() if bits},
+        )
+    return added
+
+
+def is_keyframe(save: Save) -> bool:
+    return save.keyframe_id is not None and save.keyframe_id == save.id
+
+
+def _diff_keyframes(from_save: Save, to_save: Save, kinds) -> dict:
+    current = aliased(SnapshotWord)
+    previous = aliased(SnapshotWord)
+    added = current.bits.bitwise_and(func.coalesce(previous.bits, 0).bitwise_not())
+
+    rows = (
+        db.session.query(current.kind, current.word, added)
+        .outerjoin(previous, and_(
+            previous.save_id == from_save.id,
+            previous.kind == current.kind,
+            previous.word == current.word,
+        ))
+        .filter(current.save_id == to_save.id, current.kind.in_(kinds), added != 0)
+    )
+
+    words = {kind: {} for kind in kinds}
+    for kind, word, bits in rows:
+        words[kind][word] = bits
+    return {
+        kind: unpack(ordering_for(to_save.catalog_id, kind), kind_words)
+        for kind, kind_words in words.items()
+    }
+
+
+def migrate_legacy_snapshots(game_data) -> int:
+    """
+    Convert row-per-item FishSnapshot/RecipeSnapshot data into snapshot words.
+
+    Saves without a catalog are encoded against the current game data's
+    catalog and their legacy rows are deleted. Items that are no longer in
+    the game data have no bit and are dropped. Returns the number of saves
+    migrated.
+    """
+    # Full snapshots from before delta chains are keyframes of their own
+    Save.query.filter(Save.catalog_id.isnot(None), Save.keyframe_id.is_(None)).update(
+        {Save.keyframe_id: Save.id, Save.chain_index: 0}, synchronize_session=False
+    )
+    db.session.commit()
+
+    legacy_saves = Save.query.filter(Save.catalog_id.is_(None)).all()
+    if not legacy_saves:
+        return 0
+
+    catalog_id = get_catalog(game_data)
+    rows = []
+    for save in legacy_saves:
+        state = {
+            FISH_CAUGHT: {s.fish_id for s in save.fish_snapshots if s.caught},
+            RECIPE_LEARNED: {s.recipe_name for s in save.recipe_snapshots if s.learned},
+            RECIPE_COOKED: {s.recipe_name for s in save.recipe_snapshots if s.cooked},
+        }
+        rows.extend(snapshot_values(save.id, catalog_id, state))
+        save.catalog_id = catalog_id
+        save.keyframe_id, save.parent_id, save.chain_index = save.id, None, 0
+    insert_snapshots(rows)
+
+    legacy_ids = [save.id for save in legacy_saves]
+    FishSnapshot.query.filter(FishSnapshot.save_id.in_(legacy_ids)).delete(synchronize_session=False)
+    RecipeSnapshot.query.filter(RecipeSnapshot.save_id.in_(legacy_ids)).delete(synchronize_session=False)
+    db.session.commit()
+    return len(legacy_saves)
+
+
+def history_bucket(save: Save, now: datetime):
+    """The compaction bucket of a save: only the latest save per bucket is kept."""
+    age = now - save.uploaded_at
+    for min_age, bucket in COMPACTION_POLICY:
+        if age >= min_age:
+            return min_age, bucket(save.uploaded_at)
+    return save.id  # recent uploads are all kept
+
+
+def compact_farm(farm_id: str, now: datetime) -> int:
+    """
+    Downsample one farm's snapshot history and re-encode its chains.
+
+    Returns the number of saves removed.
+    """
+    saves = Save.query.filter_by(farm_id=farm_id).order_by(Save.id).all()
+    latest = {}
+    for save in saves:
+        latest[history_bucket(save, now)] = save
+    kept_ids = {save.id for save in latest.values()}
+    dropped = [save for save in saves if save.id not in kept_ids]
+    if not dropped:
+        return 0
+
+    kept = [save for save in saves if save.id in kept_ids]
+    words = {save.id: load_words(save) for save in kept}
+
+    save_ids = [save.id for save in saves]
+    SnapshotWord.query.filter(SnapshotWord.save_id.in_(save_ids)).delete(synchronize_session=False)
+    dropped_ids = [save.id for save in dropped]
+    ProgressRollup.query.filter(ProgressRollup.save_id.in_(dropped_ids)).delete(synchronize_session=False)
+    Save.query.filter(Save.id.in_(dropped_ids)).delete(synchronize_session=False)
+
+    rows = []
+    parent = None
+    for save in kept:
+        rows.extend(chain_rows(save, words[save.id], parent, words[parent.id] if parent else None))
+        parent = save
+    insert_snapshots(rows)
+    db.session.commit()
+    return len(dropped)
+
+
+def compact_history(now: datetime | None = None) -> int:
+    """Compact every farm's snapshot history (see COMPACTION_POLICY). Returns saves removed."""
+    now = now or datetime.utcnow()
+    farm_ids = [farm_id for (farm_id,) in db.session.query(Save.farm_id).filter(Save.farm_id.isnot(None)).distinct()]
+    return sum(compact_farm(farm_id, now) for farm_id in farm_ids)
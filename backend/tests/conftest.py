@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the app off the real instance database
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "tracker.db"))
+
+
+DEMO_SAVE = os.path.join(os.path.dirname(__file__), "..", "..", "demo", "Demo_431226036")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app import init_db
+    init_db()
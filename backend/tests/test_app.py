@@ -0,0 +1,82 @@
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from app import app
+from conftest import DEMO_SAVE
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.fixture
+def demo_bytes():
+    with open(DEMO_SAVE, "rb") as f:
+        return f.read()
+
+
+def upload(client, data: bytes, name: str):
+    return client.post("/api/analyze", data={"file": (io.BytesIO(data), name)})
+
+
+def test_plain_and_compressed_uploads_of_a_save_share_a_snapshot(client, demo_bytes):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("Demo_431226036/Demo_431226036", demo_bytes)
+
+    save_ids = {
+        upload(client, data, name).get_json()["saveId"]
+        for data, name in (
+            (demo_bytes, "Demo_431226036"),
+            (gzip.compress(demo_bytes), "Demo_431226036.gz"),
+            (archive.getvalue(), "Demo_431226036.zip"),
+        )
+    }
+    assert len(save_ids) == 1
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+def test_stored_save_revalidates_with_the_etag_it_was_sent(client, demo_bytes, encoding):
+    save_id = upload(client, demo_bytes, "Demo_431226036").get_json()["saveId"]
+    headers = {"Accept-Encoding": encoding}
+
+    response = client.get(f"/api/saves/{save_id}", headers=headers)
+    assert response.status_code == 200
+    assert (response.headers.get("Content-Encoding") == "gzip") == (encoding == "gzip")
+    etag = response.headers["ETag"]
+
+    revalidated = client.get(f"/api/saves/{save_id}", headers={**headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+
+
+def test_cache_hit_skips_parsing(client, demo_bytes, monkeypatch):
+    import app as app_module
+
+    parses = []
+    analyze_save_file = app_module.analyze_save_file
+    monkeypatch.setattr(app_module, "analyze_save_file", lambda save: parses.append(1) or analyze_save_file(save))
+
+    save = demo_bytes + b"\n<!-- cache hit -->\n"
+    first = upload(client, gzip.compress(save), "Demo_431226036.gz").get_json()
+    second = upload(client, save, "Demo_431226036").get_json()
+    assert first["saveId"] == second["saveId"]
+    assert len(parses) == 1
+
+
+def test_diff_rejects_saves_of_different_farms(client, demo_bytes):
+    from models import Save, db
+
+    first = upload(client, demo_bytes + b"\n<!-- first -->\n", "Demo_431226036").get_json()["saveId"]
+    second = upload(client, demo_bytes + b"\n<!-- second -->\n", "Demo_431226036").get_json()["saveId"]
+    assert client.get(f"/api/diff?from={first}&to={second}").status_code == 200
+
+    with app.app_context():
+        for farm_id in ("another farm", None):
+            db.session.get(Save, second).farm_id = farm_id
+            db.session.commit()
+            assert client.get(f"/api/diff?from={first}&to={second}").status_code == 400
@@ -0,0 +1,19 @@
+from game_data import get_game_data
+from trackers.bundles import GOLD_ID, bundles_needing
+
+
+def test_every_bundle_ingredient_has_a_name():
+    index = get_game_data()["bundles"]
+    unknown = {
+        ingredient["id"]
+        for bundle in index["bundles"].values()
+        for ingredient in bundle["ingredients"]
+        if ingredient["id"] != GOLD_ID and ingredient["name"].startswith("Unknown")
+    }
+    assert not unknown
+
+
+def test_bundles_needing_resolves_qualified_ids():
+    index = get_game_data()["bundles"]
+    uses = bundles_needing(index, "(O)186")
+    assert [use["id"] for use in uses] == ["Pantry/4"]
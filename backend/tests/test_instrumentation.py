@@ -0,0 +1,39 @@
+import threading
+import tracemalloc
+
+from flask import Flask
+
+import instrumentation
+from instrumentation import stage
+
+
+def test_overlapping_sampled_requests_share_tracemalloc(tmp_path):
+    app = Flask(__name__)
+    app.config.update(INSTRUMENTATION=True, PROFILE_SAMPLE_RATE=1.0, PROFILE_DIR=str(tmp_path))
+    instrumentation.init_app(app)
+
+    requests = 4
+    barrier = threading.Barrier(requests)
+
+    @app.route("/work")
+    def work():
+        with stage("wait"):
+            barrier.wait(timeout=10)
+        with stage("allocate"):
+            data = [bytes(1024) for _ in range(100)]
+        return str(len(data))
+
+    statuses = []
+
+    def get():
+        statuses.append(app.test_client().get("/work").status_code)
+
+    threads = [threading.Thread(target=get) for _ in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * requests
+    assert len(list(tmp_path.glob("*.tracemalloc.txt"))) == requests
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,46 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import app
+from jobs import JobQueue, fail_orphaned_jobs
+from models import db, AnalysisJob
+
+
+@pytest.fixture
+def app_context():
+    with app.app_context():
+        AnalysisJob.query.delete()
+        db.session.commit()
+        yield
+
+
+def add_job(job_id: str, state: str, finished_at: datetime | None = None) -> None:
+    db.session.add(AnalysisJob(id=job_id, state=state, finished_at=finished_at, result={}))
+    db.session.commit()
+
+
+def test_unfinished_jobs_of_a_previous_run_are_failed(app_context):
+    add_job("queued", AnalysisJob.QUEUED)
+    add_job("running", AnalysisJob.RUNNING)
+    add_job("done", AnalysisJob.SUCCEEDED, datetime.utcnow())
+
+    assert fail_orphaned_jobs() == 2
+    states = {job.id: job.state for job in AnalysisJob.query}
+    assert states == {"queued": AnalysisJob.FAILED, "running": AnalysisJob.FAILED, "done": AnalysisJob.SUCCEEDED}
+    assert db.session.get(AnalysisJob, "queued").finished_at is not None
+
+
+def test_submit_prunes_jobs_past_retention(app_context):
+    now = datetime.utcnow()
+    add_job("old", AnalysisJob.SUCCEEDED, now - timedelta(hours=25))
+    add_job("old failure", AnalysisJob.FAILED, now - timedelta(hours=25))
+    add_job("recent", AnalysisJob.SUCCEEDED, now - timedelta(hours=1))
+    add_job("running", AnalysisJob.RUNNING)
+
+    queue = JobQueue(app, lambda stream: {}, workers=1, queue_depth=0, retention=timedelta(hours=24))
+    job_id = queue.submit(io.BytesIO()).id
+    queue._executor.shutdown(wait=True)
+
+    assert {job.id for job in AnalysisJob.query} == {"recent", "running", job_id}
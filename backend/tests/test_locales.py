@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import items
+import locales
+from app import localize_result
+from conftest import DEMO_SAVE
+from save_parser import analyze_save_file
+
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    """Empty unpacked-data and object names directories, in place of the real ones."""
+    data_dir = tmp_path / "unpacked"
+    names_dir = tmp_path / "data"
+    data_dir.mkdir()
+    names_dir.mkdir()
+    (names_dir / "object_names.json").write_text(json.dumps({"24": "Parsnip"}))
+
+    monkeypatch.setattr(locales, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(items, "OBJECT_NAMES_PATH", str(names_dir / "object_names.json"))
+    locales.available_locales.cache_clear()
+    yield data_dir, names_dir
+    locales.available_locales.cache_clear()
+
+
+def test_locale_with_only_non_name_files_is_unsupported(data_dirs):
+    data_dir, _ = data_dirs
+    (data_dir / "mail.ja-JP.json").write_text("{}")
+    (data_dir / "EngagementDialogue.ja-JP.json").write_text("{}")
+
+    assert locales.available_locales() == frozenset()
+    with pytest.raises(ValueError):
+        locales.resolve_locale("ja")
+
+
+def test_locale_with_translated_names_is_supported(data_dirs):
+    data_dir, names_dir = data_dirs
+    (data_dir / "Fish.de-DE.json").write_text("{}")
+    (names_dir / "object_names.fr-FR.json").write_text("{}")
+    (data_dir / "Bundles.ja-JP.json").write_text("{}")
+
+    assert locales.available_locales() == {"de-DE", "fr-FR", "ja-JP"}
+    assert locales.resolve_locale("de") == "de-DE"
+    assert locales.resolve_locale("fr_fr") == "fr-FR"
+    assert locales.resolve_locale("en") is None
+
+
+def test_bundle_names_are_localized_and_the_rest_falls_back_to_english():
+    strings = locales.build_locale_strings("ja-JP")
+    assert strings.bundle("Spring Crops") == "春の作物"
+    assert strings.item("24", "Parsnip") == "Parsnip"
+
+    result = analyze_save_file(DEMO_SAVE)
+    localized = localize_result(result, locales.resolve_locale("ja"))
+
+    bundles = result["bundles"]["missingList"] + result["bundles"]["completedList"]
+    localized_bundles = localized["bundles"]["missingList"] + localized["bundles"]["completedList"]
+    assert [b["name"] for b in localized_bundles] == [strings.bundle(b["name"]) for b in bundles]
+    assert any(b["name"] == "春の作物" for b in localized_bundles)
+    assert localized["players"][0]["fish"] == result["players"][0]["fish"]
@@ -0,0 +1,84 @@
+import io
+
+import pytest
+
+from conftest import DEMO_SAVE
+from prefilter import PrefilterMiss, element_end, prefilter
+from save_parser import build_results, extract, extract_save, root_paths
+from trackers import TRACKERS
+
+
+@pytest.fixture(scope="module")
+def demo_bytes():
+    with open(DEMO_SAVE, "rb") as f:
+        return f.read()
+
+
+def inflated(save: bytes, copies: int = 3) -> bytes:
+    """The save with its <locations> children repeated, as in a large late-game save."""
+    start = save.index(b"<locations>") + len(b"<locations>")
+    end = save.index(b"</locations>")
+    return save[:end] + save[start:end] * copies + save[end:]
+
+
+def coop(save: bytes, farmhands: int = 2) -> bytes:
+    """The save with copies of its host added as farmhands."""
+    start = save.index(b"<player>") + len(b"<player>")
+    host = save[start:element_end(save, b"player", start) - len(b"</player>")]
+    farmers = b"".join(
+        b"<Farmer>" + host.replace(b"<name>", b"<name>Hand%d" % i, 1) + b"</Farmer>"
+        for i in range(1, farmhands + 1)
+    )
+    assert b"<farmhands />" in save
+    return save.replace(b"<farmhands />", b"<farmhands>" + farmers + b"</farmhands>", 1)
+
+
+@pytest.mark.parametrize("variant", [
+    lambda save: save,
+    inflated,
+    coop,
+], ids=["demo", "inflated", "coop"])
+def test_prefiltered_parse_matches_full_parse(demo_bytes, variant):
+    save = variant(demo_bytes)
+    prefilter(save, root_paths(TRACKERS))  # the prefilter path is taken, not the fallback
+
+    assert build_results(extract_save(io.BytesIO(save))) == build_results(extract(io.BytesIO(save)))
+
+
+def test_coop_farmhands_are_kept(demo_bytes):
+    results = build_results(extract_save(io.BytesIO(coop(demo_bytes))))
+    assert [player["name"] for player in results["players"]][1:] == ["Hand1Dennis", "Hand2Dennis"]
+
+
+@pytest.mark.parametrize("save", [
+    b"<SaveGame><player><name>A</name></player></SaveGame><!-- trailing -->",
+    b"<SaveGame><player><name>A</name></player></SaveGame><player />",
+    b"<SaveGame><player><name>A</name></SaveGame>",
+    b"<SaveGame><player><name>A</name></player>",
+    b"<player><name>A</name></player>",
+], ids=["trailing comment", "trailing element", "unclosed child", "unclosed root", "no root"])
+def test_unrecognised_layouts_miss(save):
+    with pytest.raises(PrefilterMiss):
+        prefilter(save, {"player"})
+
+
+def test_self_closing_children():
+    save = b'<SaveGame><farmhands /><player><name>A</name><mail/></player><bundleData/></SaveGame>'
+    assert prefilter(save, {"player", "farmhands/Farmer", "bundleData"}) == save
+
+
+def test_nested_same_named_elements():
+    save = (
+        b"<SaveGame>"
+        b"<item><item><item /></item><item>x</item></item>"
+        b"<player><name>A</name></player>"
+        b"<locations><GameLocation><GameLocation>inner</GameLocation><bundles>b</bundles></GameLocation>"
+        b"<GameLocation><objects /></GameLocation></locations>"
+        b"</SaveGame>"
+    )
+    assert prefilter(save, {"player", "locations/GameLocation/bundles"}) == (
+        b"<SaveGame>"
+        b"<player><name>A</name></player>"
+        b"<locations><GameLocation><bundles>b</bundles></GameLocation><GameLocation></GameLocation></locations>"
+        b"</SaveGame>"
+    )
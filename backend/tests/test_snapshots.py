@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import false
+
+import snapshots
+from app import app
+from game_data import get_game_data
+from models import ProgressRollup, Save, SnapshotCatalog, db
+from timeline import record_rollup
+
+
+@pytest.fixture
+def app_context():
+    with app.app_context():
+        yield
+        db.session.rollback()
+
+
+def test_get_catalog_reuses_a_catalog_created_concurrently(app_context, monkeypatch):
+    game_data = get_game_data()
+    catalog_id = snapshots.get_catalog(game_data)
+
+    # Another worker inserted the version between our lookup and our insert
+    class RacingQuery:
+        lookups = 0
+
+        def filter_by(self, **kwargs):
+            RacingQuery.lookups += 1
+            query = db.session.query(SnapshotCatalog).filter_by(**kwargs)
+            return query.filter(false()) if RacingQuery.lookups == 1 else query
+
+    monkeypatch.setattr(SnapshotCatalog, "query", RacingQuery())
+    monkeypatch.setattr(snapshots, "_catalog_ids", {})
+
+    assert snapshots.get_catalog(game_data) == catalog_id
+
+
+def store_snapshot(catalog_id, state, parent=None, parent_words=None, **columns):
+    save = Save(catalog_id=catalog_id, **columns)
+    db.session.add(save)
+    db.session.flush()
+    words = snapshots.pack_state(catalog_id, state)
+    snapshots.insert_snapshots(snapshots.chain_rows(save, words, parent, parent_words))
+    return save, words
+
+
+def test_diff_snapshots_agrees_for_keyframes_and_chained_saves(app_context):
+    game_data = get_game_data()
+    catalog_id = snapshots.get_catalog(game_data)
+    fish = snapshots.ordering_for(catalog_id, snapshots.FISH_CAUGHT)
+    recipes = snapshots.ordering_for(catalog_id, snapshots.RECIPE_COOKED)
+
+    before = {snapshots.FISH_CAUGHT: fish[:3], snapshots.RECIPE_LEARNED: [], snapshots.RECIPE_COOKED: recipes[:1]}
+    after = {
+        snapshots.FISH_CAUGHT: fish[:3] + fish[70:72],
+        snapshots.RECIPE_LEARNED: [],
+        snapshots.RECIPE_COOKED: recipes[:1] + recipes[-1:],
+    }
+    expected = {
+        snapshots.FISH_CAUGHT: fish[70:72],
+        snapshots.RECIPE_COOKED: recipes[-1:],
+    }
+
+    first, first_words = store_snapshot(catalog_id, before)
+    keyframe, _ = store_snapshot(catalog_id, after)
+    chained, _ = store_snapshot(catalog_id, after, first, first_words)
+    assert snapshots.is_keyframe(keyframe) and not snapshots.is_keyframe(chained)
+
+    assert snapshots.diff_snapshots(first, keyframe) == expected
+    assert snapshots.diff_snapshots(first, chained) == expected
+
+
+def test_compact_history_keeps_the_latest_save_per_bucket(app_context):
+    catalog_id = snapshots.get_catalog(get_game_data())
+    fish = snapshots.ordering_for(catalog_id, snapshots.FISH_CAUGHT)
+    now = datetime(2026, 6, 17, 12)
+    uploads = [
+        now - timedelta(days=40),                     # same ISO week: only the later one is kept
+        now - timedelta(days=40) + timedelta(hours=1),
+        now - timedelta(days=10),                     # same day: only the later one is kept
+        now - timedelta(days=10) + timedelta(hours=1),
+        now - timedelta(days=1),                      # under a week old: both kept
+        now - timedelta(hours=1),
+    ]
+
+    saves, states = [], {}
+    parent = parent_words = None
+    for i, uploaded_at in enumerate(uploads):
+        state = {snapshots.FISH_CAUGHT: fish[:i + 1], snapshots.RECIPE_LEARNED: [], snapshots.RECIPE_COOKED: []}
+        parent, parent_words = store_snapshot(
+            catalog_id, state, parent, parent_words, farm_id="compaction", uploaded_at=uploaded_at
+        )
+        record_rollup(parent, state)
+        saves.append(parent.id)
+        states[parent.id] = state
+    db.session.commit()
+
+    assert snapshots.compact_history(now) == 2
+
+    dropped = [saves[0], saves[2]]
+    kept = [save_id for save_id in saves if save_id not in dropped]
+    assert [save.id for save in Save.query.filter_by(farm_id="compaction").order_by(Save.id)] == kept
+    assert ProgressRollup.query.filter(ProgressRollup.save_id.in_(dropped)).count() == 0
+    assert ProgressRollup.query.filter(ProgressRollup.save_id.in_(kept)).count() == len(kept)
+    for save_id in kept:
+        assert snapshots.load_state(db.session.get(Save, save_id)) == states[save_id]
+
+    assert snapshots.compact_history(now) == 0
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+import timeline
+from app import app
+from conftest import DEMO_SAVE
+from models import ProgressRollup, Save, db
+from snapshots import FISH_CAUGHT, RECIPE_COOKED, RECIPE_LEARNED
+
+
+@pytest.fixture
+def uploaded_save():
+    """Id of the demo save, uploaded once with its rollup removed again."""
+    client = app.test_client()
+    with open(DEMO_SAVE, "rb") as f:
+        response = client.post("/api/analyze", data={"file": (f, "Demo_431226036")})
+    save_id = response.get_json()["saveId"]
+
+    with app.app_context():
+        ProgressRollup.query.filter_by(save_id=save_id).delete()
+        db.session.commit()
+        yield save_id
+
+
+def test_backfill_rollups_writes_missing_rollups_once(uploaded_save):
+    assert timeline.backfill_rollups() == 1
+    assert db.session.get(ProgressRollup, uploaded_save) is not None
+    assert timeline.backfill_rollups() == 0
+
+
+def test_upload_and_backfill_rollups_agree(uploaded_save):
+    client = app.test_client()
+    with open(DEMO_SAVE, "rb") as f:
+        data = f.read() + b"\n<!-- reupload -->\n"
+    response = client.post("/api/analyze", data={"file": (io.BytesIO(data), "Demo_431226036")})
+    recorded = db.session.get(ProgressRollup, response.get_json()["saveId"])
+
+    timeline.backfill_rollups()
+    backfilled = db.session.get(ProgressRollup, uploaded_save)
+    columns = ("fish_caught", "fish_total", "recipes_learned", "recipes_cooked", "recipes_total")
+    assert [getattr(recorded, c) for c in columns] == [getattr(backfilled, c) for c in columns]
+
+
+def test_rollups_count_only_catalog_items(uploaded_save):
+    save = db.session.get(Save, uploaded_save)
+    state = timeline.load_state(save)
+    # Save keys the game data has no entry for (e.g. mod recipes)
+    extended = {
+        FISH_CAUGHT: [*state[FISH_CAUGHT], "(O)ModFish"],
+        RECIPE_LEARNED: [*state[RECIPE_LEARNED], "Mod Recipe"],
+        RECIPE_COOKED: [*state[RECIPE_COOKED], "Mod Recipe"],
+    }
+
+    rollup = timeline.rollup_values(save, extended)
+    assert rollup == timeline.rollup_values(save, state)
+    assert rollup["recipes_learned"] <= rollup["recipes_total"]
+
+
+def test_backfill_rollups_tolerates_a_concurrent_backfill(uploaded_save, monkeypatch):
+    load_state = timeline.load_state
+
+    def racing_load_state(save):
+        # Another process backfills the same save before this one inserts
+        with db.engine.begin() as conn:
+            conn.execute(
+                ProgressRollup.__table__.insert(),
+                timeline.rollup_values(save, load_state(save)),
+            )
+        return load_state(save)
+
+    monkeypatch.setattr(timeline, "load_state", racing_load_state)
+    timeline.backfill_rollups()
+    assert ProgressRollup.query.filter_by(save_id=uploaded_save).count() == 1
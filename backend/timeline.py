@@ -0,0 +1,97 @@
+"""
+Per-farm progress timeline.
+
+Every stored upload gets a ProgressRollup row with its fish and recipe
+counts, taken from its snapshot state and written in the same transaction as
+its snapshot. The timeline is then a range scan of one farm's rollups on (farm_id, save_id), so its cost
+does not depend on how the snapshots themselves are encoded.
+"""
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, ProgressRollup, Save
+from snapshots import FISH_CAUGHT, RECIPE_COOKED, RECIPE_LEARNED, load_state, ordering_for
+
+
+def rollup_values(save: Save, state: dict) -> dict:
+    """
+    The progress_rollups row for a save, from its snapshot state.
+
+    Only items in the save's catalog are counted, the same ones its bitsets
+    can hold, so a rollup written at upload agrees with one backfilled from the
+    stored snapshot and a count never exceeds its total.
+    """
+    fish_ids = ordering_for(save.catalog_id, FISH_CAUGHT)
+    recipe_names = ordering_for(save.catalog_id, RECIPE_COOKED)
+    return {
+        "save_id": save.id,
+        "farm_id": save.farm_id,
+        "uploaded_at": save.uploaded_at,
+        "fish_caught": len(set(fish_ids).intersection(state[FISH_CAUGHT])),
+        "fish_total": len(fish_ids),
+        "recipes_learned": len(set(recipe_names).intersection(state[RECIPE_LEARNED])),
+        "recipes_cooked": len(set(recipe_names).intersection(state[RECIPE_COOKED])),
+        "recipes_total": len(recipe_names),
+    }
+
+
+def record_rollup(save: Save, state: dict) -> None:
+    """Add a save's rollup row to the current transaction."""
+    db.session.execute(insert(ProgressRollup), [rollup_values(save, state)])
+
+
+def backfill_rollups() -> int:
+    """
+    Write rollups for saves stored before rollups existed, from their snapshots.
+
+    Run once after upgrading, with backfill_rollups.py. Rows another process
+    wrote in the meantime are left as they are, so concurrent runs are safe.
+
+    Returns the number of saves backfilled.
+    """
+    saves = (
+        Save.query
+        .outerjoin(ProgressRollup, ProgressRollup.save_id == Save.id)
+        .filter(ProgressRollup.save_id.is_(None), Save.keyframe_id.isnot(None))
+        .all()
+    )
+    rows = [rollup_values(save, load_state(save)) for save in saves]
+    if rows:
+        db.session.execute(sqlite_insert(ProgressRollup).on_conflict_do_nothing(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def timeline_version(farm_id: str) -> tuple:
+    """(points, first save id, last save id) of a farm's timeline, changing whenever it does."""
+    return db.session.query(
+        func.count(ProgressRollup.save_id),
+        func.min(ProgressRollup.save_id),
+        func.max(ProgressRollup.save_id),
+    ).filter(ProgressRollup.farm_id == farm_id).one()
+
+
+def percent(count: int, total: int) -> float:
+    return round(100 * count / total, 1) if total else 0.0
+
+
+def farm_timeline(farm_id: str) -> list[dict]:
+    """A farm's progress at each of its uploads, oldest first."""
+    rollups = (
+        ProgressRollup.query
+        .filter(ProgressRollup.farm_id == farm_id)
+        .order_by(ProgressRollup.save_id)
+    )
+    return [
+        {
+            "saveId": rollup.save_id,
+            "uploadedAt": rollup.uploaded_at.isoformat(),
+            "fishCaught": rollup.fish_caught,
+            "fishPercent": percent(rollup.fish_caught, rollup.fish_total),
+            "recipesLearned": rollup.recipes_learned,
+            "recipesLearnedPercent": percent(rollup.recipes_learned, rollup.recipes_total),
+            "recipesCooked": rollup.recipes_cooked,
+            "recipesCookedPercent": percent(rollup.recipes_cooked, rollup.recipes_total),
+        }
+        for rollup in rollups
+    ]
@@ -0,0 +1,26 @@
+"""
+Perfection trackers.
+
+Each tracker is a Tracker subclass (see trackers.base). Adding a category
+means writing a tracker and listing it in TRACKERS; the game data registry
+and the save dispatcher pick it up from there without another pass over
+the save.
+"""
+from trackers.base import Tracker
+from trackers.bundles import BundleTracker
+from trackers.cooking import CookingTracker
+from trackers.crafting import CraftingTracker
+from trackers.farm import FarmTracker
+from trackers.fish import FishTracker
+
+TRACKERS = (
+    BundleTracker(),
+    CookingTracker(),
+    CraftingTracker(),
+    FarmTracker(),
+    FishTracker(),
+)
+
+__all__ = [
+    "TRACKERS", "Tracker", "BundleTracker", "CookingTracker", "CraftingTracker", "FarmTracker", "FishTracker",
+]
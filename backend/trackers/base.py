@@ -0,0 +1,107 @@
+"""Base class and shared save-format readers for perfection trackers."""
+
+
+class Tracker:
+    """
+    One perfection category (fish, cooking, ...).
+
+    A tracker declares the save elements it reads (save_paths) and the
+    unpacked game data files it depends on (data_files). The game data
+    registry builds each tracker's index once per process from those files,
+    and the save dispatcher makes a single pass over the save, handing every
+    matching subtree to the trackers that asked for it.
+
+    Per-player trackers (the default) read each farmer separately: their
+    save_paths are relative to a Farmer element, and they are collected once
+    for the host and once for every farmhand. Farm-wide trackers set
+    per_player = False and give save_paths relative to the SaveGame root.
+    """
+
+    key = None          # key of this tracker's section in the analysis result
+    per_player = True   # collected per farmer rather than once per save
+    save_paths = ()     # e.g. ("fishCaught",)
+    data_files = ()     # e.g. ("Fish.json",)
+
+    def build_index(self, tables: dict, items: dict) -> dict:
+        """
+        Precompute this tracker's game data index.
+
+        Args:
+            tables: {data file: "content" dict of the unpacked JSON} for data_files
+            items: the items.ItemCatalog
+
+        Returns:
+            dict of plain, picklable structures (it is stored in the compiled bundle)
+        """
+        return {}
+
+    def new_state(self) -> dict:
+        """Fresh per-save state for collect() to fill in."""
+        return {}
+
+    def collect(self, state: dict, path: str, elem) -> None:
+        """Read one matching save element (path is the save_paths entry it matched)."""
+        raise NotImplementedError
+
+    def merge_states(self, states: list) -> dict:
+        """
+        Combine per-player states into the farm-wide state.
+
+        The default handles states shaped {field: {key: count}}: keys are
+        unioned and their counts summed.
+        """
+        merged = self.new_state()
+        for state in states:
+            for field, counts in state.items():
+                target = merged[field]
+                for key, count in counts.items():
+                    target[key] = target.get(key, 0) + count
+        return merged
+
+    def build_result(self, state: dict, index, items) -> dict:
+        """
+        Compare the collected state against the index and format this tracker's results.
+
+        Args:
+            items: the items.ItemCatalog (GameData.items)
+        """
+        raise NotImplementedError
+
+    def localize(self, result: dict, strings) -> dict:
+        """
+        Translate the display names in a build_result() result.
+
+        Results are shared through the result cache, so this returns a copy
+        rather than editing result in place.
+
+        Args:
+            strings: locales.LocaleStrings of the requested language
+        """
+        return result
+
+
+def localize_recipes(recipes: list, strings) -> list:
+    """Translate the recipe and ingredient names of a missingList."""
+    return [
+        {
+            **recipe,
+            "name": strings.recipe(recipe["name"]),
+            "ingredients": [
+                {**ingredient, "name": strings.item(ingredient["id"], ingredient["name"])}
+                for ingredient in recipe["ingredients"]
+            ],
+        }
+        for recipe in recipes
+    ]
+
+
+def parse_dict(node):
+    """Generic dict reader from the Stardew save format."""
+    result = {}
+    for item in node.iterfind("item"):
+        key = item.find("./key/string")
+        val = item.find("./value/int")
+        if key is not None and val is not None:
+            result[key.text] = int(val.text)
+    return result
+
@@ -0,0 +1,169 @@
+"""Community Center: every bundle completed, room by room."""
+from items import canonical_id
+from trackers.base import Tracker
+
+# Ingredient id of the Vault's gold "items"
+GOLD_ID = "-1"
+
+
+def parse_bundle(definition: str, items) -> dict:
+    """
+    Parse one bundle definition string (as in Bundles.json and a save's bundleData).
+
+    Format: name/reward/ingredients (id quantity quality ...)/color/number required/.../display name
+    """
+    parts = definition.split("/")
+
+    tokens = parts[2].split()
+    ingredients = []
+    for i in range(0, len(tokens), 3):
+        item_id = canonical_id(tokens[i])
+        quantity = int(tokens[i+1])
+        ingredients.append({
+            "id": item_id,
+            "name": f"{quantity:,}g" if item_id == GOLD_ID else items.name(item_id),
+            "quantity": quantity,
+            "quality": int(tokens[i+2]),
+        })
+
+    # An empty number required means every ingredient
+    required = int(parts[4]) if len(parts) > 4 and parts[4] else len(ingredients)
+    return {
+        "name": parts[-1] or parts[0],
+        "ingredients": tuple(ingredients),
+        "required": min(required, len(ingredients)),
+    }
+
+
+def load_bundle_data(content: dict, items) -> dict:
+    """Parse Bundles.json content into {bundle key ("Pantry/0"): bundle info}."""
+    return {key: parse_bundle(definition, items) for key, definition in content.items()}
+
+
+def build_bundle_item_index(bundles: dict) -> dict:
+    """Inverted index of {ingredient id: ((bundle key, quantity, quality), ...)}."""
+    index = {}
+    for key, bundle in bundles.items():
+        for ingredient in bundle["ingredients"]:
+            if ingredient["id"] != GOLD_ID:
+                index.setdefault(ingredient["id"], []).append((key, ingredient["quantity"], ingredient["quality"]))
+    return {item_id: tuple(uses) for item_id, uses in index.items()}
+
+
+def bundles_needing(index, item_id: str) -> list:
+    """The bundles that take item_id, with the quantity and minimum quality each needs."""
+    return [
+        {
+            "id": key,
+            "room": key.split("/")[0],
+            "name": index["bundles"][key]["name"],
+            "quantity": quantity,
+            "quality": quality,
+        }
+        for key, quantity, quality in index["item_bundles"].get(canonical_id(item_id), ())
+    ]
+
+
+def parse_bundle_flags(node):
+    """Read the Community Center's bundles into {bundle number: (donated flag per ingredient, ...)}."""
+    flags = {}
+    for item in node.iterfind("item"):
+        key = item.find("./key/int")
+        values = item.findall("./value/ArrayOfBoolean/boolean")
+        if key is not None:
+            flags[key.text] = tuple(value.text == "true" for value in values)
+    return flags
+
+
+class BundleTracker(Tracker):
+    key = "bundles"
+    per_player = False
+    save_paths = ("bundleData", "locations/GameLocation/bundles")
+    data_files = ("Bundles.json",)
+
+    def build_index(self, tables, items):
+        content = tables["Bundles.json"]
+        bundles = load_bundle_data(content, items)
+        return {
+            "bundles": bundles,
+            # Parsed bundles by definition, so a save's bundleData is matched
+            # against these rather than reparsed
+            "definitions": {definition: bundles[key] for key, definition in content.items()},
+            "item_bundles": build_bundle_item_index(bundles),
+        }
+
+    def new_state(self):
+        return {"definitions": {}, "donated": {}}
+
+    def collect(self, state, path, elem):
+        if path == "bundleData":
+            for item in elem.iterfind("item"):
+                key = item.find("./key/string")
+                value = item.find("./value/string")
+                if key is not None and value is not None:
+                    state["definitions"][key.text] = value.text
+        else:
+            state["donated"].update(parse_bundle_flags(elem))
+
+    def build_result(self, state, index, items):
+        if state["definitions"]:
+            bundles = {
+                key: index["definitions"].get(definition) or parse_bundle(definition, items)
+                for key, definition in state["definitions"].items()
+            }
+        else:
+            # Saves from before bundleData was written use the standard bundles
+            bundles = index["bundles"]
+
+        rooms = {}
+        missing_bundles = []
+        completed_bundles = []
+        for key, bundle in bundles.items():
+            room = key.split("/")[0]
+            donated = state["donated"].get(key.split("/")[1], ())
+            remaining = [
+                ingredient for i, ingredient in enumerate(bundle["ingredients"])
+                if i >= len(donated) or not donated[i]
+            ]
+            donated_count = len(bundle["ingredients"]) - len(remaining)
+
+            summary = rooms.setdefault(room, {"name": room, "total": 0, "completed": 0})
+            summary["total"] += 1
+
+            if donated_count >= bundle["required"]:
+                summary["completed"] += 1
+                completed_bundles.append({"id": key, "room": room, "name": bundle["name"]})
+            else:
+                missing_bundles.append({
+                    "id": key,
+                    "room": room,
+                    "name": bundle["name"],
+                    "needed": bundle["required"] - donated_count,
+                    "ingredients": remaining,
+                })
+
+        return {
+            "total": len(bundles),
+            "completed": len(completed_bundles),
+            "remaining": len(missing_bundles),
+            "rooms": list(rooms.values()),
+            "missingList": missing_bundles,
+            "completedList": completed_bundles,
+        }
+
+    def localize(self, result, strings):
+        return {
+            **result,
+            "missingList": [
+                {
+                    **bundle,
+                    "name": strings.bundle(bundle["name"]),
+                    "ingredients": [
+                        {**ingredient, "name": strings.item(ingredient["id"], ingredient["name"])}
+                        for ingredient in bundle["ingredients"]
+                    ],
+                }
+                for bundle in result["missingList"]
+            ],
+            "completedList": [{**b, "name": strings.bundle(b["name"])} for b in result["completedList"]],
+        }
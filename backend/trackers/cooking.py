@@ -0,0 +1,96 @@
+"""Cooking: every recipe learned and cooked at least once."""
+from trackers.base import Tracker, localize_recipes, parse_dict
+
+
+def load_cooking_data(content: dict, items) -> dict:
+    """Parse CookingRecipes.json content into {recipe name: recipe info}."""
+    recipes = {}
+
+    for name, recipe_str in content.items():
+        parts = recipe_str.strip("/").split("/")
+
+        ing_tokens = parts[0].split()
+        ingredients = []
+        for i in range(0, len(ing_tokens), 2):
+            item_id = ing_tokens[i]
+            quantity = int(ing_tokens[i+1])
+            ingredients.append({"id": item_id, "name": items.name(item_id), "quantity": quantity})
+
+        output = 1
+        recipe_id = parts[2] if len(parts) >= 3 else None
+
+        recipes[name] = {
+            "ingredients": tuple(ingredients),
+            "output": output,
+            "id": recipe_id
+        }
+
+    return recipes
+
+
+class CookingTracker(Tracker):
+    key = "recipes"
+    save_paths = ("cookingRecipes", "recipesCooked")
+    data_files = ("CookingRecipes.json",)
+
+    def build_index(self, tables, items):
+        recipes = load_cooking_data(tables["CookingRecipes.json"], items)
+        return {
+            "recipes": recipes,
+            "recipe_id_to_name": {info["id"]: name for name, info in recipes.items()},
+        }
+
+    def new_state(self):
+        return {"learned": {}, "cooked": {}}
+
+    def collect(self, state, path, elem):
+        if path == "cookingRecipes":
+            state["learned"].update(parse_dict(elem))
+        else:
+            state["cooked"].update(parse_dict(elem))
+
+    def build_result(self, state, index, items):
+        game_recipes = index["recipes"]
+
+        all_recipes = set(game_recipes.keys())
+        learned_set = set(state["learned"].keys())
+
+        id_to_name = index["recipe_id_to_name"]
+        cooked_set = set()
+        for fid in state["cooked"].keys():
+            if fid in id_to_name:
+                cooked_set.add(id_to_name[fid])
+            else:
+                cooked_set.add(fid)
+
+        missing_to_cook = sorted(all_recipes - cooked_set)
+        missing_to_learn = sorted(all_recipes - learned_set)
+
+        # Format missing recipes with ingredients
+        missing_recipes_detailed = []
+        for recipe_name in missing_to_cook:
+            recipe_info = {
+                "name": recipe_name,
+                "ingredients": game_recipes[recipe_name]["ingredients"],
+                "needToLearn": recipe_name not in learned_set
+            }
+            missing_recipes_detailed.append(recipe_info)
+
+        cooked_list = [{"name": name} for name in sorted(cooked_set)]
+
+        return {
+            "total": len(all_recipes),
+            "learned": len(learned_set),
+            "cooked": len(cooked_set),
+            "missingToLearn": len(missing_to_learn),
+            "missingToCook": len(missing_to_cook),
+            "missingList": missing_recipes_detailed,
+            "cookedList": cooked_list,
+        }
+
+    def localize(self, result, strings):
+        return {
+            **result,
+            "missingList": localize_recipes(result["missingList"], strings),
+            "cookedList": [{"name": strings.recipe(r["name"])} for r in result["cookedList"]],
+        }
@@ -0,0 +1,99 @@
+"""Crafting: every recipe learned and crafted at least once."""
+from items import canonical_id
+from trackers.base import Tracker, localize_recipes, parse_dict
+
+
+def load_crafting_data(content: dict, items) -> dict:
+    """Parse CraftingRecipes.json content into {recipe name: recipe info}."""
+    recipes = {}
+
+    for name, recipe_str in content.items():
+        # ingredients/location/output id [quantity]/big craftable/unlock condition[/display name]
+        parts = recipe_str.split("/")
+
+        ing_tokens = parts[0].split()
+        ingredients = []
+        for i in range(0, len(ing_tokens), 2):
+            item_id = ing_tokens[i]
+            quantity = int(ing_tokens[i+1])
+            ingredients.append({"id": item_id, "name": items.name(item_id), "quantity": quantity})
+
+        output_tokens = parts[2].split()
+        recipes[name] = {
+            "ingredients": tuple(ingredients),
+            "output": int(output_tokens[1]) if len(output_tokens) > 1 else 1,
+            "id": output_tokens[0],
+            "bigCraftable": parts[3] == "true",
+        }
+
+    return recipes
+
+
+def build_ingredient_index(recipes: dict) -> dict:
+    """Inverted index of {ingredient id: recipe names that use it}."""
+    index = {}
+    for name, info in recipes.items():
+        for ingredient in info["ingredients"]:
+            index.setdefault(ingredient["id"], []).append(name)
+    return {item_id: tuple(sorted(names)) for item_id, names in index.items()}
+
+
+def recipes_using(index, item_id: str) -> tuple:
+    """Names of the crafting recipes that take item_id as an ingredient."""
+    return index["ingredient_index"].get(canonical_id(item_id), ())
+
+
+class CraftingTracker(Tracker):
+    key = "crafting"
+    save_paths = ("craftingRecipes",)
+    data_files = ("CraftingRecipes.json",)
+
+    def build_index(self, tables, items):
+        recipes = load_crafting_data(tables["CraftingRecipes.json"], items)
+        return {
+            "recipes": recipes,
+            "recipe_names": frozenset(recipes),
+            "ingredient_index": build_ingredient_index(recipes),
+        }
+
+    def new_state(self):
+        return {"known": {}}
+
+    def collect(self, state, path, elem):
+        # Learned recipes, each with the number of times it has been crafted
+        state["known"].update(parse_dict(elem))
+
+    def build_result(self, state, index, items):
+        game_recipes = index["recipes"]
+        all_recipes = index["recipe_names"]
+
+        learned_set = set(state["known"]) & all_recipes
+        crafted_set = {name for name, count in state["known"].items() if count > 0} & all_recipes
+
+        missing_to_craft = sorted(all_recipes - crafted_set)
+
+        missing_recipes_detailed = [
+            {
+                "name": recipe_name,
+                "ingredients": game_recipes[recipe_name]["ingredients"],
+                "needToLearn": recipe_name not in learned_set,
+            }
+            for recipe_name in missing_to_craft
+        ]
+
+        return {
+            "total": len(all_recipes),
+            "learned": len(learned_set),
+            "crafted": len(crafted_set),
+            "missingToLearn": len(all_recipes - learned_set),
+            "missingToCraft": len(missing_to_craft),
+            "missingList": missing_recipes_detailed,
+            "craftedList": [{"name": name} for name in sorted(crafted_set)],
+        }
+
+    def localize(self, result, strings):
+        return {
+            **result,
+            "missingList": localize_recipes(result["missingList"], strings),
+            "craftedList": [{"name": strings.recipe(r["name"])} for r in result["craftedList"]],
+        }
@@ -0,0 +1,17 @@
+"""Farm identity: which game a save belongs to, shared by all of its players."""
+from trackers.base import Tracker
+
+
+class FarmTracker(Tracker):
+    key = "farm"
+    per_player = False
+    save_paths = ("uniqueIDForThisGame",)
+
+    def new_state(self):
+        return {"gameId": None}
+
+    def collect(self, state, path, elem):
+        state["gameId"] = elem.text
+
+    def build_result(self, state, index, items):
+        return {"gameId": state["gameId"]}
@@ -0,0 +1,219 @@
+"""Fishing: every fish species caught at least once."""
+from items import canonical_id
+from trackers.base import Tracker
+
+
+SEASONS = ("spring", "summer", "fall", "winter")
+WEATHERS = ("sunny", "rainy")
+
+# Fishing hours of a day, in game time: 6am up to 2am (hour 25)
+HOURS = range(6, 26)
+
+# Weather the game treats as one of WEATHERS when picking fish
+WEATHER_ALIASES = {"stormy": "rainy", "snowy": "sunny", "windy": "sunny"}
+
+# Fish without seasonal, weather or time restrictions
+ANY_TIME = {"seasons": SEASONS, "weather": WEATHERS, "times": ((600, 2600),)}
+
+
+def parse_fish_string(fish_string: str) -> dict:
+    """
+    Parse one Fish.json entry into its name and when it can be caught.
+
+    Rod fish: name/difficulty/behavior/min size/max size/times (start end ...)/seasons/weather/...
+    Crab pot fish: name/trap/... and can be caught at any time.
+    """
+    parts = fish_string.split("/")
+    if parts[1] == "trap":
+        return {"name": parts[0], **ANY_TIME}
+
+    times = [int(t) for t in parts[5].split()]
+    return {
+        "name": parts[0],
+        "seasons": tuple(season for season in SEASONS if season in parts[6].split()),
+        "weather": WEATHERS if parts[7] == "both" else (parts[7],),
+        "times": tuple(zip(times[::2], times[1::2])),
+    }
+
+
+def load_fish_data(content: dict) -> dict:
+    """Parse Fish.json content into {fish id: fish info}."""
+    fish_dict = {}
+    for fish_id, fish_string in content.items():
+        fish_dict[fish_id] = parse_fish_string(fish_string)
+
+    # Add jellies that aren't in Fish.json but count for collection
+    fish_dict["CaveJelly"] = {"name": "Cave Jelly", **ANY_TIME}
+    fish_dict["RiverJelly"] = {"name": "River Jelly", **ANY_TIME}
+    fish_dict["SeaJelly"] = {"name": "Sea Jelly", **ANY_TIME}
+
+    return fish_dict
+
+
+def build_availability_index(fish: dict) -> dict:
+    """
+    Bitmasks of the fish catchable in each season, weather and hour.
+
+    Each fish gets a bit (its position in "order"). A fish's seasons, weather
+    and hours are independent conditions, so the fish catchable at a given
+    season, weather and hour are the intersection of the three masks.
+    """
+    order = tuple(sorted(fish))
+    seasons = [0] * len(SEASONS)
+    weathers = [0] * len(WEATHERS)
+    hours = [0] * len(HOURS)
+
+    for bit, fish_id in enumerate(order):
+        info = fish[fish_id]
+        for season in info["seasons"]:
+            seasons[SEASONS.index(season)] |= 1 << bit
+        for weather in info["weather"]:
+            weathers[WEATHERS.index(weather)] |= 1 << bit
+        for i, hour in enumerate(HOURS):
+            if any(start <= hour * 100 < end for start, end in info["times"]):
+                hours[i] |= 1 << bit
+
+    return {
+        "order": order,
+        "bits": {fish_id: bit for bit, fish_id in enumerate(order)},
+        "all": (1 << len(order)) - 1,
+        "season": tuple(seasons),
+        "weather": tuple(weathers),
+        "hour": tuple(hours),
+    }
+
+
+def fishing_conditions(season: str | None = None, weather: str | None = None, hour: int | None = None) -> dict:
+    """
+    Validate a "catchable now" query. Any condition left out matches all of its values.
+
+    Args:
+        season: spring, summer, fall or winter
+        weather: sunny or rainy (or an alias such as stormy)
+        hour: Hour of the day, 0-23; 0 and 1 are the small hours after midnight
+
+    Raises:
+        ValueError: for an unknown season or weather, or an hour no fish can be caught at
+    """
+    if season is not None:
+        season = season.lower()
+        if season not in SEASONS:
+            raise ValueError(f"Unknown season: {season}")
+    if weather is not None:
+        weather = WEATHER_ALIASES.get(weather.lower(), weather.lower())
+        if weather not in WEATHERS:
+            raise ValueError(f"Unknown weather: {weather}")
+    if hour is not None:
+        if hour < HOURS.start:
+            hour += 24
+        if hour not in HOURS:
+            raise ValueError("Fishing hours are 6 to 1 (6am to 2am)")
+    return {"season": season, "weather": weather, "hour": hour}
+
+
+def catchable_fish(index, caught, conditions: dict) -> list:
+    """
+    The uncaught fish that can be caught under conditions (see fishing_conditions).
+
+    Args:
+        index: The fish tracker's index
+        caught: Ids of the fish already caught
+    """
+    availability = index["availability"]
+    bits = availability["bits"]
+
+    mask = availability["all"]
+    for fish_id in caught:
+        if fish_id in bits:
+            mask &= ~(1 << bits[fish_id])
+    if conditions["season"] is not None:
+        mask &= availability["season"][SEASONS.index(conditions["season"])]
+    if conditions["weather"] is not None:
+        mask &= availability["weather"][WEATHERS.index(conditions["weather"])]
+    if conditions["hour"] is not None:
+        mask &= availability["hour"][conditions["hour"] - HOURS.start]
+
+    fish = []
+    while mask:
+        bit = (mask & -mask).bit_length() - 1
+        fish_id = availability["order"][bit]
+        fish.append({"id": fish_id, "name": index["fish"][fish_id]["name"]})
+        mask &= mask - 1
+    return fish
+
+
+def parse_fish_dict(node):
+    """Read a fishCaught collection into {fish_id: times_caught}."""
+    fish = {}
+    for item in node.iterfind("item"):
+        key_node = item.find("./key/string")
+        val_nodes = item.findall("./value/ArrayOfInt/int")
+
+        if key_node is None or not val_nodes:
+            continue
+
+        fish[canonical_id(key_node.text)] = int(val_nodes[0].text)
+
+    return fish
+
+
+class FishTracker(Tracker):
+    key = "fish"
+    save_paths = ("fishCaught",)
+    data_files = ("Fish.json",)
+
+    def build_index(self, tables, items):
+        fish = load_fish_data(tables["Fish.json"])
+        return {"fish": fish, "fish_ids": frozenset(fish), "availability": build_availability_index(fish)}
+
+    def new_state(self):
+        return {"caught": {}}
+
+    def collect(self, state, path, elem):
+        state["caught"].update(parse_fish_dict(elem))
+
+    def build_result(self, state, index, items):
+        fish_data = index["fish"]
+
+        all_fish = index["fish_ids"]
+        caught_fish_set = set(state["caught"].keys())
+        uncaught_fish = all_fish - caught_fish_set
+
+        missing_fish_detailed = []
+        for fish_id in sorted(uncaught_fish):
+            fish_info = fish_data.get(fish_id)
+            if fish_info:
+                missing_fish_detailed.append({
+                    "id": fish_id,
+                    "name": fish_info["name"]
+                })
+
+        caught_fish_detailed = []
+        for fish_id in sorted(caught_fish_set):
+            fish_info = fish_data.get(fish_id)
+            if fish_info:
+                caught_fish_detailed.append({
+                    "id": fish_id,
+                    "name": fish_info["name"]
+                })
+
+        return {
+            "total": len(all_fish),
+            "caught": len(caught_fish_set),
+            "uncaught": len(uncaught_fish),
+            "missingList": missing_fish_detailed,
+            "caughtList": caught_fish_detailed,
+        }
+
+    def localize(self, result, strings):
+        localized = {
+            **result,
+            "missingList": [{**f, "name": strings.item(f["id"], f["name"])} for f in result["missingList"]],
+            "caughtList": [{**f, "name": strings.item(f["id"], f["name"])} for f in result["caughtList"]],
+        }
+        if "catchableNow" in result:
+            localized["catchableNow"] = {
+                **result["catchableNow"],
+                "fish": [{**f, "name": strings.item(f["id"], f["name"])} for f in result["catchableNow"]["fish"]],
+            }
+        return localized
@@ -0,0 +1,162 @@
+"""
+Transparent decompression of uploaded saves.
+
+Saves are mostly repetitive XML and compress several times over, so uploads
+may be sent as:
+- the raw save file
+- a gzip (.gz) or zstd (.zst) compressed save file
+- a zip of the save file, or of the whole save folder (Farm_123/Farm_123
+  alongside SaveGameInfo)
+
+The format is detected from the leading bytes, not the file name.
+open_save() yields a readable stream of the save XML that decompresses
+incrementally as the parser reads it, so the uncompressed save is never held
+in memory or written out. Decompressed output is capped at a maximum size, so
+a small compressed upload cannot expand without bound.
+
+zstd support needs the optional `zstandard` package.
+"""
+import gzip
+import hashlib
+import io
+import posixpath
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Files in a save folder that are not the save itself
+SAVE_FOLDER_EXTRAS = {"SaveGameInfo", "SaveGameInfo_old"}
+
+
+class UnsupportedUpload(ValueError):
+    """The upload is not a save file in a supported format."""
+
+
+class UploadTooLarge(ValueError):
+    """The upload decompresses to more than the allowed size."""
+
+
+class SpooledUpload(tempfile.SpooledTemporaryFile):
+    """Upload held in memory until it grows past max_size, recording when it moves to disk."""
+
+    on_disk = False
+
+    def rollover(self):
+        super().rollover()
+        self.on_disk = True
+
+
+class BoundedReader(io.RawIOBase):
+    """Read-only stream that fails once more than limit bytes have been read from it."""
+
+    def __init__(self, stream, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self._read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._read += len(data)
+        if self._read > self._limit:
+            raise UploadTooLarge(f"Save file is larger than {self._limit // (1024 * 1024)}MB uncompressed")
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def find_save_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """
+    The save file inside a zip.
+
+    That is the file named after its own folder (Farm_123/Farm_123) for a
+    zipped save folder, or the only file otherwise.
+    """
+    files = [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+    ]
+    for info in files:
+        folder, name = posixpath.split(info.filename)
+        if name and name == posixpath.basename(folder):
+            return info
+
+    saves = [
+        info for info in files
+        if posixpath.basename(info.filename) not in SAVE_FOLDER_EXTRAS
+        and not info.filename.endswith("_old")
+    ]
+    if len(saves) != 1:
+        raise UnsupportedUpload("Zip file does not contain a single save file")
+    return saves[0]
+
+
+@contextmanager
+def open_save(stream, max_size: int):
+    """
+    Open the save XML inside an uploaded stream.
+
+    Args:
+        stream: Seekable binary upload stream, positioned at its start
+        max_size: Maximum uncompressed save size in bytes
+
+    Yields:
+        Readable binary stream of the save XML. The upload stream itself is
+        left open.
+    """
+    magic = stream.read(4)
+    stream.seek(0)
+
+    if magic.startswith(GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=stream, mode="rb") as save:
+            yield BoundedReader(save, max_size)
+
+    elif magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise UnsupportedUpload("zstd compressed uploads are not supported by this server")
+        with zstandard.ZstdDecompressor().stream_reader(stream, closefd=False) as save:
+            yield BoundedReader(save, max_size)
+
+    elif magic == ZIP_MAGIC:
+        try:
+            archive = zipfile.ZipFile(stream)
+        except zipfile.BadZipFile as e:
+            raise UnsupportedUpload(f"Invalid zip file: {e}") from e
+        member = find_save_member(archive)
+        if member.file_size > max_size:
+            raise UploadTooLarge(f"Save file is larger than {max_size // (1024 * 1024)}MB uncompressed")
+        # The declared size is not trusted: the reader enforces the limit too
+        with archive.open(member) as save:
+            yield BoundedReader(save, max_size)
+
+    else:
+        yield stream
+
+
+def save_digest(stream, max_size: int, chunk_size: int = 1024 * 1024) -> str:
+    """
+    sha256 hex digest of the save XML inside an upload stream, leaving the stream rewound.
+
+    The save is hashed after decompression, so the same save uploaded plain
+    or compressed has one digest.
+    """
+    digest = hashlib.sha256()
+    with open_save(stream, max_size) as save:
+        for chunk in iter(lambda: save.read(chunk_size), b""):
+            digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
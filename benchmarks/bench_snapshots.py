@@ -0,0 +1,118 @@
+"""
+Benchmark snapshot persistence in uploads/sec (save_snapshot + compute_diff).
+
+Compares the original storage path (one FishSnapshot/RecipeSnapshot ORM row
+per item, added one at a time, default rollback journal with a full fsync
+on commit) against the current one (bulk-inserted bitset snapshot words on a
+WAL-mode database with synchronous=NORMAL).
+
+Usage (from the repository root):
+
+    python benchmarks/bench_snapshots.py [--uploads 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND)
+
+# Keep app.py away from the real tracker.db
+_scratch = tempfile.mkdtemp(prefix="tracker-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'import.db')}"
+
+from flask import Flask  # noqa: E402
+
+import app as tracker  # noqa: E402
+import models  # noqa: E402
+from models import db, Save, FishSnapshot, RecipeSnapshot  # noqa: E402
+from save_parser import analyze_save_file  # noqa: E402
+
+DEMO_SAVE = os.path.join(BACKEND, "..", "demo", "Demo_431226036")
+
+
+def legacy_save_snapshot(result: dict) -> Save:
+    """The original row-per-item save_snapshot."""
+    save = Save()
+    db.session.add(save)
+    db.session.flush()
+
+    for fish in result["fish"].get("caughtList", []):
+        db.session.add(FishSnapshot(save_id=save.id, fish_id=fish["id"], fish_name=fish["name"], caught=True))
+    for fish in result["fish"]["missingList"]:
+        db.session.add(FishSnapshot(save_id=save.id, fish_id=fish["id"], fish_name=fish["name"], caught=False))
+    for recipe in result["recipes"].get("cookedList", []):
+        db.session.add(RecipeSnapshot(save_id=save.id, recipe_name=recipe["name"], learned=True, cooked=True))
+    for recipe in result["recipes"]["missingList"]:
+        db.session.add(RecipeSnapshot(
+            save_id=save.id, recipe_name=recipe["name"],
+            learned=not recipe["needToLearn"], cooked=False,
+        ))
+
+    db.session.commit()
+    return save
+
+
+def legacy_compute_diff(current_save: Save) -> dict | None:
+    """The original compute_diff, hydrating both saves' snapshot rows."""
+    previous_save = Save.query.filter(Save.id < current_save.id).order_by(Save.id.desc()).first()
+    if previous_save is None:
+        return None
+    prev_caught = {s.fish_id for s in previous_save.fish_snapshots if s.caught}
+    curr_caught = {s.fish_id for s in current_save.fish_snapshots if s.caught}
+    prev_cooked = {s.recipe_name for s in previous_save.recipe_snapshots if s.cooked}
+    curr_cooked = {s.recipe_name for s in current_save.recipe_snapshots if s.cooked}
+    return {"fish": curr_caught - prev_caught, "recipes": curr_cooked - prev_cooked}
+
+
+MODES = {
+    "legacy": {
+        "pragmas": {"journal_mode": "DELETE", "synchronous": "FULL"},
+        "save_snapshot": legacy_save_snapshot,
+        "compute_diff": legacy_compute_diff,
+    },
+    "current": {
+        "pragmas": dict(models.SQLITE_PRAGMAS),
+        "save_snapshot": tracker.save_snapshot,
+        "compute_diff": tracker.compute_diff,
+    },
+}
+
+
+def run_mode(name: str, result: dict, uploads: int) -> float:
+    """Time `uploads` snapshot+diff cycles on a fresh database; returns uploads/sec."""
+    mode = MODES[name]
+    models.SQLITE_PRAGMAS.clear()
+    models.SQLITE_PRAGMAS.update(mode["pragmas"])
+
+    bench_app = Flask(__name__)
+    bench_app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(_scratch, name + '.db')}"
+    db.init_app(bench_app)
+
+    with bench_app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        for _ in range(uploads):
+            save = mode["save_snapshot"](result)
+            mode["compute_diff"](save)
+        elapsed = time.perf_counter() - start
+        db.engine.dispose()
+
+    return uploads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=200, help="uploads per mode")
+    args = parser.parse_args()
+
+    result = analyze_save_file(DEMO_SAVE)
+    for name in MODES:
+        rate = run_mode(name, result, args.uploads)
+        print(f"{name:>8}: {rate:8.1f} uploads/sec")
+
+
+if __name__ == "__main__":
+    main()
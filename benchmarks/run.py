@@ -0,0 +1,278 @@
+"""
+Reproducible benchmark suite for the tracker backend.
+
+Covers save parsing (analyze_save_file), game data loading
+(load_cooking_data/load_fish_data, and build_game_data from the compiled
+bundle and from the raw JSON as separate cases), persistence
+(save_snapshot, compute_diff) and an end-to-end /api/analyze request through
+the Flask test client. Parsing and the endpoint run against the demo save
+plus synthetic saves inflated to the requested sizes.
+
+Every case runs in a fresh process so its peak RSS is its own. Each case
+reports latency percentiles, peak RSS, and the peak traced memory and
+net allocated block count of one extra iteration run under tracemalloc. Results are
+written to JSON so runs can be compared between commits.
+
+Usage (from the repository root):
+
+    python benchmarks/run.py [--sizes 10 50 100] [--iterations 20] [--output FILE]
+"""
+import argparse
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+BACKEND = os.path.join(ROOT, "backend")
+DEMO_SAVE = os.path.join(ROOT, "demo", "Demo_431226036")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SCRATCH = os.path.join(tempfile.gettempdir(), "tracker-bench")
+
+
+def inflate_save(size_mb: int) -> str:
+    """
+    Write a copy of the demo save padded to roughly size_mb megabytes.
+
+    The padding repeats the demo's <locations> children, which is where the
+    bulk of a real late-game save lives, so the result is valid XML with the
+    same player data as the demo. Generated saves are reused between runs.
+    """
+    path = os.path.join(SCRATCH, f"inflated_{size_mb}mb.xml")
+    if os.path.exists(path):
+        return path
+
+    with open(DEMO_SAVE, "rb") as f:
+        data = f.read()
+    start = data.index(b"<locations>") + len(b"<locations>")
+    end = data.index(b"</locations>")
+    locations = data[start:end]
+
+    copies = max(0, (size_mb * 1024 * 1024 - len(data)) // len(locations) + 1)
+    with open(path, "wb") as f:
+        f.write(data[:end])
+        for _ in range(copies):
+            f.write(locations)
+        f.write(data[end:])
+    return path
+
+
+# -------- CASES -------- #
+# Each case takes its parameter and returns the zero-argument callable to time.
+
+def case_load_cooking_data(_):
+    import items
+    from game_data import load_table
+    from trackers.cooking import load_cooking_data
+    catalog = items.build_item_catalog({name: load_table(name) for name in items.DATA_FILES})
+    return lambda: load_cooking_data(load_table("CookingRecipes.json"), catalog)
+
+
+def case_load_fish_data(_):
+    from game_data import load_table
+    from trackers.fish import load_fish_data
+    return lambda: load_fish_data(load_table("Fish.json"))
+
+
+def case_build_game_data(source):
+    """Build GameData from a freshly compiled bundle ("bundle") or from the raw JSON ("json")."""
+    import functools
+    import game_data
+    if source == "bundle":
+        bundle_path = game_data.compile_bundle(os.path.join(SCRATCH, "game_data.pickle"))
+        game_data.load_bundle = functools.partial(game_data.load_bundle, bundle_path=bundle_path)
+    else:
+        game_data.load_bundle = lambda fingerprint: None
+    return game_data.build_game_data
+
+
+def case_analyze_save_file(save_path):
+    from save_parser import analyze_save_file
+    return lambda: analyze_save_file(save_path)
+
+
+def _bench_app():
+    import app as tracker
+    tracker.app.config["MAX_CONTENT_LENGTH"] = None
+    tracker.init_db()
+    return tracker
+
+
+def case_save_snapshot(_):
+    from save_parser import analyze_save_file
+    tracker = _bench_app()
+    result = analyze_save_file(DEMO_SAVE)
+
+    def run():
+        with tracker.app.app_context():
+            tracker.save_snapshot(result)
+    return run
+
+
+def case_compute_diff(_):
+    from save_parser import analyze_save_file
+    tracker = _bench_app()
+    result = analyze_save_file(DEMO_SAVE)
+    with tracker.app.app_context():
+        tracker.save_snapshot(result)
+        save_id = tracker.save_snapshot(result).id
+
+    def run():
+        with tracker.app.app_context():
+            tracker.compute_diff(tracker.db.session.get(tracker.Save, save_id))
+    return run
+
+
+def case_analyze_endpoint(save_path):
+    tracker = _bench_app()
+    client = tracker.app.test_client()
+    with open(save_path, "rb") as f:
+        data = f.read()
+    uploads = itertools.count(1)
+
+    def run():
+        # Trailing whitespace unique to each upload makes its hash new, so every
+        # iteration is a full analysis and snapshot rather than a cache hit or
+        # a re-upload of a stored save
+        padding = b"\n" + format(next(uploads), "b").replace("0", " ").replace("1", "\t").encode()
+        response = client.post("/api/analyze", data={"file": (io.BytesIO(data + padding), "save")})
+        assert response.status_code == 200, response.get_json()
+    return run
+
+
+CASES = {
+    "load_cooking_data": case_load_cooking_data,
+    "load_fish_data": case_load_fish_data,
+    "build_game_data": case_build_game_data,
+    "analyze_save_file": case_analyze_save_file,
+    "save_snapshot": case_save_snapshot,
+    "compute_diff": case_compute_diff,
+    "analyze_endpoint": case_analyze_endpoint,
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run_case(name, param, iterations, db_path):
+    """Run one case in the current (fresh) process and return its measurements."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, BACKEND)
+
+    fn = CASES[name](param)
+    fn()  # warm-up
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    net_allocations = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024
+
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p90_ms": percentile(timings, 90) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "max_ms": max(timings) * 1000,
+        "peak_rss_bytes": max_rss,
+        "traced_peak_bytes": traced_peak,
+        "net_allocations": net_allocations,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the tracker benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 50, 100],
+                        help="Synthetic save sizes in MB (default: 10 50 100)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed iterations per case")
+    parser.add_argument("--cases", nargs="*", choices=sorted(CASES), help="Only run these cases")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    os.makedirs(SCRATCH, exist_ok=True)
+    saves = {"demo": DEMO_SAVE}
+    for size in args.sizes:
+        saves[f"{size}mb"] = inflate_save(size)
+
+    plan = [
+        ("load_cooking_data", None, None),
+        ("load_fish_data", None, None),
+        ("build_game_data", "bundle", "bundle"),
+        ("build_game_data", "json", "json"),
+        ("save_snapshot", None, None),
+        ("compute_diff", None, None),
+    ]
+    for label, path in saves.items():
+        plan.append(("analyze_save_file", label, path))
+        plan.append(("analyze_endpoint", label, path))
+    if args.cases:
+        plan = [entry for entry in plan if entry[0] in args.cases]
+
+    commit = _git_commit()
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for name, label, param in plan:
+        # Fewer iterations for the big saves keeps a full run in minutes
+        big = label in saves and label != "demo"
+        iterations = max(3, args.iterations // 5) if big else args.iterations
+        db_path = os.path.join(SCRATCH, f"{name}-{label or 'base'}.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+        with ctx.Pool(1) as pool:
+            stats = pool.apply(run_case, (name, param, iterations, db_path))
+        results.append({"case": name, "input": label, **stats})
+        print(
+            f"{name:<18} {label or '':<6} p50 {stats['p50_ms']:9.2f} ms  p99 {stats['p99_ms']:9.2f} ms  "
+            f"rss {stats['peak_rss_bytes'] / 2**20:7.1f} MB  allocs {stats['net_allocations']}",
+            flush=True,
+        )
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf8") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
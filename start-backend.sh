@@ -1,4 +1,10 @@
 #!/bin/bash
 cd backend
+echo "Compiling game data bundle..."
+python build_game_data.py
+echo "Upgrading the database..."
+python init_db.py
+echo "Backfilling progress timelines..."
+python backfill_rollups.py
 echo "Starting Flask backend on http://localhost:5001..."
 python app.py
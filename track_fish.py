@@ -1,50 +1,21 @@
-import json
-import xml.etree.ElementTree as ET
+import os
+import sys
+
+# Share the backend's game data loader (and its precompiled bundle)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from game_data import get_game_data  # noqa: E402
+from save_parser import extract_save  # noqa: E402
+from trackers.fish import FishTracker  # noqa: E402
 
-FISH_JSON_PATH = "xnbcli-macos/unpacked/Fish.json" 
 
 def load_fish_data():
-    with open(FISH_JSON_PATH, "r", encoding="utf8") as f:
-        data = json.load(f)
-    # Extract content and parse fish names from the string format
-    fish_dict = {}
-    for fish_id, fish_string in data.get("content", {}).items():
-        # Format: "Name/difficulty/behavior/..." - name is first segment
-        name = fish_string.split("/")[0]
-        fish_dict[fish_id] = {"Name": name}
-    return fish_dict
+    return get_game_data().fish
 
 def get_fish_species(save_path):
-    root = ET.parse(save_path).getroot()
-    fish_nodes = root.findall(".//fishCaught")
-
-    if not fish_nodes:
-        return {}
-
-    node = next((n for n in fish_nodes if len(list(n)) > 0), None)
-    if node is None:
-        return {}
-
-    fish = {}
-    for item in node.findall("item"):
-        key_node = item.find("./key/string")
-        val_nodes = item.findall("./value/ArrayOfInt/int")
-
-        if key_node is None or not val_nodes:
-            continue
-
-        fish_id_raw = key_node.text
-
-        # Strip "(O)" prefix for numeric fish IDs
-        if fish_id_raw.startswith("(O)"):
-            fish_id = fish_id_raw[3:]  # keep as string, no int conversion
-        else:
-            fish_id = fish_id_raw
-
-        caught = int(val_nodes[0].text)
-        fish[fish_id] = caught
-
-    return fish
+    """Fish caught by any player on the farm: {fish_id: times caught}."""
+    tracker = FishTracker()
+    players = extract_save(save_path, [tracker])["players"]
+    return tracker.merge_states([player["states"][tracker.key] for player in players])["caught"]
 
 
 def main():
@@ -68,13 +39,13 @@ def main():
     print("=== CAUGHT ===")
     for fid in sorted(caught_fish):
         info = fish_data.get(str(fid))
-        name = info.get("Name") if info else f"{fid}"
+        name = info.get("name") if info else f"{fid}"
         print(f"{name} → {caught[fid]} times")
 
     print("\n=== UNCAUGHT ===")
     for fid in sorted(uncaught_fish):
         info = fish_data.get(str(fid))
-        name = info.get("Name") if info else f"Unknown ({fid})"
+        name = info.get("name") if info else f"Unknown ({fid})"
         print(name)
 
 
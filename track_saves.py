@@ -0,0 +1,109 @@
+"""
+Analyze every farm in a Stardew Valley saves directory in parallel.
+
+Each save is parsed exactly once, on a process pool spread across the
+machine's cores, and the results are combined into one JSON or CSV report.
+
+Usage:
+    python track_saves.py [SAVES_DIR] [--format json|csv] [--output FILE] [--workers N]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Share the backend's parser and game data loader
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from game_data import get_game_data  # noqa: E402
+from save_parser import analyze_save_file  # noqa: E402
+
+DEFAULT_SAVES_DIR = os.path.expanduser("~/.config/StardewValley/Saves")
+
+CSV_FIELDS = [
+    "farm", "path", "error", "players",
+    "recipes_total", "recipes_learned", "recipes_cooked", "fish_total", "fish_caught",
+    "crafting_total", "crafting_learned", "crafting_crafted", "bundles_total", "bundles_completed",
+    "missing_fish", "missing_recipes",
+]
+
+
+def find_saves(saves_dir):
+    """Return (farm, path) for every save in the standard Saves/<Farm_ID>/<Farm_ID> layout."""
+    saves = []
+    for farm in sorted(os.listdir(saves_dir)):
+        path = os.path.join(saves_dir, farm, farm)
+        if os.path.isfile(path):
+            saves.append((farm, path))
+    return saves
+
+
+def analyze(save):
+    farm, path = save
+    try:
+        return {"farm": farm, "path": path, "result": analyze_save_file(path)}
+    except Exception as e:
+        return {"farm": farm, "path": path, "error": str(e)}
+
+
+def to_csv_row(entry):
+    row = {"farm": entry["farm"], "path": entry["path"], "error": entry.get("error", "")}
+    result = entry.get("result")
+    if result:
+        recipes, fish, crafting, bundles = result["recipes"], result["fish"], result["crafting"], result["bundles"]
+        row.update({
+            "players": "; ".join(player["name"] for player in result["players"]),
+            "recipes_total": recipes["total"],
+            "recipes_learned": recipes["learned"],
+            "recipes_cooked": recipes["cooked"],
+            "fish_total": fish["total"],
+            "fish_caught": fish["caught"],
+            "crafting_total": crafting["total"],
+            "crafting_learned": crafting["learned"],
+            "crafting_crafted": crafting["crafted"],
+            "bundles_total": bundles["total"],
+            "bundles_completed": bundles["completed"],
+            "missing_fish": "; ".join(f["name"] for f in fish["missingList"]),
+            "missing_recipes": "; ".join(r["name"] for r in recipes["missingList"]),
+        })
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze every farm in a Stardew Valley saves directory.")
+    parser.add_argument("saves_dir", nargs="?", default=DEFAULT_SAVES_DIR, help="Saves directory")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Output format")
+    parser.add_argument("--output", help="Write to this file instead of stdout")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    saves = find_saves(args.saves_dir)
+    if not saves:
+        print(f"No saves found in {args.saves_dir}", file=sys.stderr)
+        return 1
+
+    # Each worker loads the game data once, then reuses it for every save it gets
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=get_game_data) as pool:
+        entries = list(pool.map(analyze, saves))
+
+    out = open(args.output, "w", newline="", encoding="utf8") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump(entries, out, indent=2)
+            out.write("\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(to_csv_row(entry) for entry in entries)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    failed = sum(1 for entry in entries if "error" in entry)
+    print(f"Analyzed {len(entries) - failed} of {len(entries)} saves", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())